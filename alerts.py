@@ -0,0 +1,168 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+import requests
+
+from metrics import registry
+from rate_limiter import RateLimiter, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+ALERTS = registry.counter('sr_alerts_total', 'Alerts by outcome (queued/duplicate/dropped/sent/failed)')
+
+def format_signal(signal):
+    return (f"🚨 Signal Alert\n"
+            f"Symbol: {signal['symbol']}\n"
+            f"Side: {signal['side'].upper()}\n"
+            f"Price: ${signal['price']:.2f}\n"
+            f"Time: {signal['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
+
+def format_batch(signals):
+    if len(signals) == 1:
+        return format_signal(signals[0])
+    lines = [f"🚨 {len(signals)} Signal Alerts"]
+    for signal in signals:
+        lines.append(f"{signal['symbol']} {signal['side'].upper()} ${signal['price']:.2f} "
+                     f"at {signal['timestamp'].strftime('%H:%M:%S')}")
+    return '\n'.join(lines)
+
+class TelegramError(Exception):
+    def __init__(self, message, retry_after=None, retryable=True):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+class TelegramSender:
+    """Posts one message to a chat; raises TelegramError on failure"""
+
+    def __init__(self, token, chat_id, timeout=10, session=None):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.session = session or requests
+
+    def __call__(self, text):
+        try:
+            response = self.session.post(self.url, data={'chat_id': self.chat_id, 'text': text}, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TelegramError(str(e))
+        if response.status_code == 429:
+            try:
+                retry_after = response.json()['parameters']['retry_after']
+            except Exception:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            raise TelegramError("rate limited", retry_after=retry_after)
+        if response.status_code >= 400:
+            raise TelegramError(f"HTTP {response.status_code}", retryable=response.status_code >= 500)
+
+class AlertDispatcher:
+    """Deliver alerts off the detection path.
+
+    submit() never blocks: a signal is dropped if the same symbol and side was
+    alerted within dedupe_window seconds, or if the bounded queue is full.
+    Worker threads take a signal, wait up to coalesce_window seconds for more
+    to arrive and send them as one message (at most max_batch per message).
+    Sends share a token bucket (TELEGRAM_RATE messages per second, default 1,
+    bursts of TELEGRAM_BURST, default 3). Failures are retried up to
+    max_retries times, honouring Telegram's retry_after on 429s.
+    """
+
+    def __init__(self, send, workers=2, max_queue=1000, dedupe_window=300.0,
+                 coalesce_window=2.0, max_batch=20, max_retries=3, base_backoff=1.0, limiter=None):
+        self.send = send
+        self.dedupe_window = dedupe_window
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.limiter = limiter or RateLimiter('telegram',
+                                              rate=float(os.environ.get('TELEGRAM_RATE', 1)),
+                                              capacity=int(os.environ.get('TELEGRAM_BURST', 3)))
+        self.clock = time.monotonic
+        self.sleep = time.sleep
+        self._queue = queue.Queue(max_queue)
+        self._recent = {}
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, name=f"alerts-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, signal):
+        """Queue a signal for delivery; returns False if it was a duplicate or the queue is full"""
+        key = (signal['symbol'], signal['side'])
+        now = self.clock()
+        with self._lock:
+            last = self._recent.get(key)
+            if last is not None and now - last < self.dedupe_window:
+                ALERTS.inc(outcome='duplicate')
+                return False
+            self._recent[key] = now
+            if len(self._recent) > 10000:
+                self._recent = {k: t for k, t in self._recent.items() if now - t < self.dedupe_window}
+        try:
+            self._queue.put_nowait(signal)
+        except queue.Full:
+            # Never delivered, so it mustn't suppress the next alert for this pair
+            with self._lock:
+                if self._recent.get(key) == now:
+                    del self._recent[key]
+            ALERTS.inc(outcome='dropped')
+            logger.warning("Alert queue full, dropping %s %s", signal['symbol'], signal['side'])
+            return False
+        ALERTS.inc(outcome='queued')
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def join(self):
+        """Block until everything queued so far has been sent or given up on"""
+        self._queue.join()
+
+    def _take_batch(self):
+        batch = [self._queue.get()]
+        deadline = self.clock() + self.coalesce_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                self._deliver(format_batch(batch), len(batch))
+            except Exception:
+                logger.exception("Alert worker failed")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, text, count):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                self.send(text)
+                # Win back some of the rate a 429 took off the shared bucket
+                self.limiter.recover()
+                ALERTS.inc(count, outcome='sent')
+                return True
+            except TelegramError as e:
+                if not e.retryable or attempt == self.max_retries:
+                    ALERTS.inc(count, outcome='failed')
+                    logger.warning("Giving up on alert after %d attempts: %s", attempt + 1, e)
+                    return False
+                if e.retry_after is not None:
+                    self.limiter.throttle(e.retry_after)
+                else:
+                    self.sleep(self.base_backoff * 2 ** attempt)
+        return False
@@ -1,46 +1,199 @@
 from flask import Flask, render_template, request, jsonify
+import atexit
 import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-import requests
 import time
 
+# Shared modules live in the project root, one level above this function
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_source import get_data_source
+from metrics import PROVIDER_SECONDS, UPSTREAM_ERRORS, init_app, upstream
+from provider_health import ProviderHealth
+from profiling import init_profiling
+from log_config import setup_logging
+from serialization import init_serialization
+from response_cache import ResponseCache, cache_warmer
+from scheduler import Scheduler, init_scheduler
+from projection import ANALYSIS_COLUMNS, analysis_rows, shape
+from warm_start import PriceSnapshot
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
 class SupportResistanceAnalyzer:
-    def __init__(self):
+    def __init__(self, data_source=None, snapshot=None):
         self.coingecko_base = "https://api.coingecko.com/api/v3"
+        self.source = data_source or get_data_source()
         self.last_call_time = 0
+        # 'hedged' races the providers, 'sequential' tries them one by one
+        self.price_mode = os.environ.get('PRICE_FETCH_MODE', 'hedged')
+        # Seconds to wait for a provider before also asking the next one (0 = all at once)
+        self.hedge_delay = float(os.environ.get('PRICE_HEDGE_DELAY', 0.3))
+        self.price_timeout = float(os.environ.get('PRICE_TIMEOUT', 10))
+        # Providers that keep failing are skipped until their cooldown expires
+        self.health = ProviderHealth(
+            failure_threshold=int(os.environ.get('PROVIDER_FAILURE_THRESHOLD', 3)),
+            cooldown=float(os.environ.get('PROVIDER_COOLDOWN', 30))
+        )
+        # Last known prices from an earlier instance, used once per coin after a cold start
+        self.snapshot = snapshot
     
-    def get_current_price(self, coin_id):
-        # Try multiple free APIs with better error handling
-        apis = [
+    def price_providers(self):
+        return [
             ('CoinGecko', self.get_price_coingecko),
             ('Binance', self.get_price_binance),
             ('Kraken', self.get_price_kraken),
             ('CoinAPI', self.get_price_coinapi)
         ]
+    
+    def get_current_price(self, coin_id):
+        return self.fetch_price(coin_id)['price']
+    
+    def fetch_price(self, coin_id):
+        """Return {'price', 'provider', 'providers'} where providers holds each API's latency and status.
+
+        Right after a cold start the first lookup of a coin the snapshot knows
+        is answered from it (provider 'snapshot', plus 'fetched_at', the wall
+        time that price was fetched); every other lookup goes to the providers.
+        """
+        cached = self.snapshot.take(coin_id) if self.snapshot else None
+        if cached is None:
+            return self.fetch_price_live(coin_id)
+        price, provider, fetched_at = cached
+        age = round(max(time.time() - fetched_at, 0), 1)
+        return {'price': price, 'provider': 'snapshot', 'fetched_at': fetched_at,
+                'providers': {'snapshot': {'status': 'won', 'latency_ms': 0, 'source': provider, 'age_s': age}}}
+    
+    def fetch_price_live(self, coin_id):
+        apis, skipped = self.health.ordered(self.price_providers())
+        with upstream('get_current_price'):
+            if self.price_mode == 'sequential':
+                result = self.fetch_price_sequential(coin_id, apis)
+            else:
+                result = self.fetch_price_hedged(coin_id, apis)
+        if result['price'] is None:
+            UPSTREAM_ERRORS.inc(operation='get_current_price')
         
+        for api_name in skipped:
+            result['providers'][api_name] = {'status': 'circuit_open', 'latency_ms': 0}
+        if self.snapshot and result['price'] is not None:
+            self.snapshot.record(coin_id, result['price'], result['provider'])
+        return result
+    
+    def _record(self, api_name, price, latency_ms, error):
+        # No price lowers the provider's score, but only errors trip its breaker:
+        # a provider that doesn't list one coin still answers for the others
+        if price and price > 0:
+            self.health.record(api_name, True, latency_ms)
+            status = 'ok'
+        elif error is not None:
+            self.health.record(api_name, False, latency_ms)
+            status = 'error'
+        else:
+            self.health.record(api_name, False, latency_ms, trip=False)
+            status = 'no_price'
+        PROVIDER_SECONDS.observe(latency_ms / 1000, provider=api_name, status=status)
+    
+    def _timed_call(self, api_func, coin_id):
+        start = time.time()
+        try:
+            price = api_func(coin_id)
+            error = None
+        except Exception as e:
+            price = None
+            error = str(e)
+        return price, round((time.time() - start) * 1000, 1), error
+    
+    def fetch_price_sequential(self, coin_id, apis):
+        # Try multiple free APIs with better error handling
+        report = {}
         for api_name, api_func in apis:
-            try:
-                price = api_func(coin_id)
-                if price and price > 0:
-                    print(f"✅ {api_name} success: {coin_id} = ${price}")
-                    return price
-            except Exception as e:
-                print(f"❌ {api_name} failed: {e}")
-                continue
+            price, latency_ms, error = self._timed_call(api_func, coin_id)
+            self._record(api_name, price, latency_ms, error)
+            if price and price > 0:
+                logger.debug("%s success: %s = $%s", api_name, coin_id, price)
+                report[api_name] = {'status': 'won', 'latency_ms': latency_ms}
+                return {'price': price, 'provider': api_name, 'providers': report}
+            logger.debug("%s failed for %s: %s", api_name, coin_id, error or 'no price')
+            report[api_name] = {'status': 'failed', 'latency_ms': latency_ms}
         
-        print(f"❌ All APIs failed for {coin_id}")
-        return None
+        logger.warning("All price APIs failed for %s", coin_id)
+        return {'price': None, 'provider': None, 'providers': report}
+    
+    def fetch_price_hedged(self, coin_id, apis):
+        # Start the first provider, then start the next one whenever the running
+        # ones have failed or hedge_delay passes without an answer. The first
+        # valid price wins and the rest are abandoned.
+        if not apis:
+            # Every breaker is open; fetch_price_live reports them as circuit_open
+            logger.warning("No price providers available for %s", coin_id)
+            return {'price': None, 'provider': None, 'providers': {}}
+        report = {name: {'status': 'skipped', 'latency_ms': None} for name, _ in apis}
+        executor = ThreadPoolExecutor(max_workers=len(apis))
+        pending = {}
+        started = {}
+        next_api = 0
+        launch_at = 0
+        deadline = time.time() + self.price_timeout
+        
+        try:
+            while True:
+                now = time.time()
+                if next_api < len(apis) and (not pending or now >= launch_at):
+                    api_name, api_func = apis[next_api]
+                    pending[executor.submit(self._timed_call, api_func, coin_id)] = api_name
+                    report[api_name]['status'] = 'running'
+                    started[api_name] = now
+                    next_api += 1
+                    launch_at = now + self.hedge_delay
+                    continue
+                
+                if not pending or now >= deadline:
+                    break
+                
+                timeout = deadline - now
+                if next_api < len(apis):
+                    timeout = min(timeout, launch_at - now)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    api_name = pending.pop(future)
+                    price, latency_ms, error = future.result()
+                    report[api_name]['latency_ms'] = latency_ms
+                    self._record(api_name, price, latency_ms, error)
+                    if price and price > 0:
+                        report[api_name]['status'] = 'won'
+                        for other in pending.values():
+                            # Latency of an abandoned call is how long it had run so far
+                            report[other] = {'status': 'cancelled', 'latency_ms': round((time.time() - started[other]) * 1000, 1)}
+                        logger.debug("%s won: %s = $%s (%s ms)", api_name, coin_id, price, latency_ms)
+                        return {'price': price, 'provider': api_name, 'providers': report}
+                    report[api_name]['status'] = 'failed'
+                    logger.debug("%s failed for %s: %s", api_name, coin_id, error or 'no price')
+        finally:
+            # Don't wait for the losers; their answers are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        for api_name in pending.values():
+            report[api_name] = {'status': 'timeout', 'latency_ms': round((time.time() - started[api_name]) * 1000, 1)}
+            self.health.record(api_name, False, report[api_name]['latency_ms'])
+        logger.warning("All price APIs failed for %s", coin_id)
+        return {'price': None, 'provider': None, 'providers': report}
     
     def get_price_coingecko(self, coin_id):
         url = f"{self.coingecko_base}/simple/price"
         params = {'ids': coin_id, 'vs_currencies': 'usd'}
-        response = requests.get(url, params=params, timeout=10)
+        response = self.source.get(url, params=params, timeout=self.price_timeout)
+        response.raise_for_status()
         
         if response.status_code == 200:
             data = response.json()
             if coin_id in data and 'usd' in data[coin_id]:
                 price = data[coin_id]['usd']
-                print(f"✅ CoinGecko: {coin_id} = ${price}")
                 return price
         return None
     
@@ -56,13 +209,13 @@ class SupportResistanceAnalyzer:
             return None
             
         url = f"https://rest.coinapi.io/v1/exchangerate/{symbol}/USD"
-        response = requests.get(url, timeout=10)
+        response = self.source.get(url, timeout=self.price_timeout)
+        response.raise_for_status()
         
         if response.status_code == 200:
             data = response.json()
             price = data.get('rate')
             if price:
-                print(f"✅ CoinAPI: {coin_id} = ${price}")
                 return price
         return None
     
@@ -78,13 +231,13 @@ class SupportResistanceAnalyzer:
             return None
             
         url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
-        response = requests.get(url, timeout=10)
+        response = self.source.get(url, timeout=self.price_timeout)
+        response.raise_for_status()
         
         if response.status_code == 200:
             data = response.json()
             price = float(data.get('price', 0))
             if price > 0:
-                print(f"✅ Binance: {coin_id} = ${price}")
                 return price
         return None
     
@@ -100,26 +253,28 @@ class SupportResistanceAnalyzer:
             return None
             
         url = f"https://api.kraken.com/0/public/Ticker?pair={symbol}"
-        response = requests.get(url, timeout=10)
+        response = self.source.get(url, timeout=self.price_timeout)
+        response.raise_for_status()
         
         if response.status_code == 200:
             data = response.json()
             if 'result' in data:
                 for pair_data in data['result'].values():
                     price = float(pair_data['c'][0])  # Last trade price
-                    print(f"✅ Kraken: {coin_id} = ${price}")
                     return price
         return None
     
     def analyze_coin(self, coin_id, coin_name, symbol, selected_timeframes=None):
-        print(f"🔄 Getting real-time price for {coin_id}...")
-        current_price = self.get_current_price(coin_id)
+        logger.debug("Getting real-time price for %s", coin_id)
+        price_result = self.fetch_price(coin_id)
+        current_price = price_result['price']
         
         if current_price is None:
             return {
                 'error': f'Unable to get real-time price for {coin_name}.',
                 'message': 'All price APIs (CoinGecko, Binance, Kraken, CoinAPI) are currently unavailable. Please try again in a few minutes.',
-                'suggestion': 'This usually resolves within 1-2 minutes. The APIs may be experiencing high traffic.'
+                'suggestion': 'This usually resolves within 1-2 minutes. The APIs may be experiencing high traffic.',
+                'price_providers': price_result['providers']
             }
         
         # Generate support/resistance levels
@@ -144,8 +299,10 @@ class SupportResistanceAnalyzer:
             'name': coin_name,
             'symbol': symbol,
             'current_price': round(current_price, 4),
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'price_source': 'Multiple APIs (Real-time)',
+            # A snapshot price is dated when it was fetched, not when it was served
+            'last_updated': datetime.fromtimestamp(price_result.get('fetched_at') or time.time()).strftime('%Y-%m-%d %H:%M:%S'),
+            'price_source': price_result['provider'],
+            'price_providers': price_result['providers'],
             'timeframes': {},
             'recommendations': []
         }
@@ -187,6 +344,15 @@ class SupportResistanceAnalyzer:
         
         return analysis
     
+    def refresh_snapshot(self, cancel, limit=10):
+        """Scheduler job: fetch live prices for the top coins so the snapshot stays fresh for the next cold start"""
+        for coin in self.get_top_coins(limit):
+            if cancel.is_set():
+                break
+            self.fetch_price_live(coin['id'])
+        if self.snapshot:
+            self.snapshot.save()
+    
     def get_top_coins(self, limit=50):
         # Always return reliable coin list
         return [
@@ -209,13 +375,41 @@ class SupportResistanceAnalyzer:
         ][:limit]
 
 app = Flask(__name__, template_folder='../templates')
-analyzer = SupportResistanceAnalyzer()
+init_serialization(app)
+init_app(app)
+init_profiling(app)
+response_cache = ResponseCache()
+# Prices saved by earlier instances, so a cold start can answer without the providers (WARM_START=0 disables)
+snapshot = PriceSnapshot() if os.environ.get('WARM_START', '1').lower() not in ('0', 'false', 'no') else None
+if snapshot:
+    snapshot.load()
+    # Prices recorded since the last throttled write still reach the file on a clean exit
+    atexit.register(snapshot.flush)
+analyzer = SupportResistanceAnalyzer(snapshot=snapshot)
+
+# Off by default: a serverless instance is frozen between requests, so only
+# long-running deployments should set CACHE_WARM=1 / SNAPSHOT_REFRESH=1
+# (or POST /jobs/<name>/start)
+scheduler = Scheduler()
+scheduler.add('cache-warmer',
+              cache_warmer(app, os.environ.get('CACHE_WARM_PATHS', '/get-coins').split(',')),
+              interval=float(os.environ.get('CACHE_WARM_INTERVAL', 12)),
+              jitter=float(os.environ.get('CACHE_WARM_JITTER', 1)),
+              start=os.environ.get('CACHE_WARM', '').lower() in ('1', 'true', 'yes'))
+if snapshot:
+    scheduler.add('snapshot-refresher',
+                  lambda cancel: analyzer.refresh_snapshot(cancel, int(os.environ.get('SNAPSHOT_REFRESH_COINS', 10))),
+                  interval=float(os.environ.get('SNAPSHOT_REFRESH_INTERVAL', 60)),
+                  jitter=float(os.environ.get('SNAPSHOT_REFRESH_JITTER', 5)),
+                  start=os.environ.get('SNAPSHOT_REFRESH', '').lower() in ('1', 'true', 'yes'))
+init_scheduler(app, scheduler)
 
 @app.route('/')
 def index():
     return render_template('sr_index.html')
 
 @app.route('/analyze-coin/<coin_id>')
+@response_cache.cached()
 def analyze_coin_route(coin_id):
     timeframes = request.args.get('timeframes', '').split(',') if request.args.get('timeframes') else None
     
@@ -226,7 +420,16 @@ def analyze_coin_route(coin_id):
         return jsonify({'error': f'Coin {coin_id} not found'})
     
     analysis = analyzer.analyze_coin(coin_id, coin_info['name'], coin_info['symbol'], timeframes)
-    return jsonify(analysis)
+    if 'error' in analysis:
+        return jsonify(analysis)
+    payload, error = shape(analysis, request.args, analysis_rows, ANALYSIS_COLUMNS)
+    if error:
+        return jsonify({'error': error})
+    response = jsonify(payload)
+    if analysis['price_source'] == 'snapshot':
+        # Served once from the warm start snapshot; the next request must fetch live
+        response.headers['Cache-Control'] = 'no-store'
+    return response
 
 @app.route('/scan-opportunities')
 def scan_opportunities():
@@ -239,7 +442,12 @@ def scan_opportunities():
 def stop_scan():
     return jsonify({'status': 'Scan not available'})
 
+@app.route('/provider-health')
+def provider_health():
+    return jsonify(analyzer.health.status())
+
 @app.route('/get-coins')
+@response_cache.cached()
 def get_coins():
     coins = analyzer.get_top_coins(20)
     result = []
@@ -251,4 +459,4 @@ def get_coins():
             'price': coin['current_price'],
             'change_24h': coin['price_change_percentage_24h']
         })
-    return jsonify(result)
\ No newline at end of file
+    return jsonify(result)
@@ -1,23 +1,26 @@
 from flask import Flask, render_template, request, jsonify
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 # import ccxt  # Will be installed separately if needed
-import requests
 import sqlite3
-import threading
-import time
 import json
+import os
+from log_config import setup_logging
+from serialization import init_serialization
+from alerts import AlertDispatcher, TelegramSender
+from scheduler import Scheduler, init_scheduler
 
+setup_logging()
 app = Flask(__name__)
+init_serialization(app)
 
 class TradingBot:
     def __init__(self):
         self.exchange = None
-        self.scanner_active = False
         self.auto_trading = False
         self.telegram_token = ""
         self.telegram_chat_id = ""
+        # Delivery runs on the dispatcher's threads so a slow Telegram never holds up scanning
+        self.alerts = AlertDispatcher(self.deliver_telegram)
         
     def init_exchange(self, api_key, secret):
         # Mock exchange for demo
@@ -28,6 +31,8 @@ class TradingBot:
         }
     
     def backtest(self, symbol, start_date, end_date, balance, leverage, strategy_params):
+        import numpy as np  # loaded on first use, not at startup
+        
         # Simplified backtest logic
         trades = []
         current_balance = balance
@@ -51,15 +56,17 @@ class TradingBot:
             'win_rate': len([t for t in trades if t['profit'] > 0]) / len(trades) * 100
         }
     
-    def scan_signals(self):
-        while self.scanner_active:
-            # Mock signal detection
-            signals = self.detect_signals()
-            for signal in signals:
-                self.send_telegram_alert(signal)
-            time.sleep(60)
+    def scan_signals(self, cancel):
+        # One pass; the scheduler runs it every SCANNER_INTERVAL seconds
+        signals = self.detect_signals()
+        for signal in signals:
+            if cancel.is_set():
+                break
+            self.send_telegram_alert(signal)
     
     def detect_signals(self):
+        import numpy as np
+        
         # Mock signal detection
         pairs = ['BTCUSDT', 'ETHUSDT', 'ADAUSDT']
         signals = []
@@ -78,21 +85,15 @@ class TradingBot:
     def send_telegram_alert(self, signal):
         if not self.telegram_token or not self.telegram_chat_id:
             return
-            
-        message = f"🚨 Signal Alert\n"
-        message += f"Symbol: {signal['symbol']}\n"
-        message += f"Side: {signal['side'].upper()}\n"
-        message += f"Price: ${signal['price']:.2f}\n"
-        message += f"Time: {signal['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}"
-        
-        url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
-        data = {
-            'chat_id': self.telegram_chat_id,
-            'text': message
-        }
-        requests.post(url, data=data)
+        self.alerts.submit(signal)
+    
+    def deliver_telegram(self, text):
+        # Reads the config at send time, so /config changes apply to queued alerts
+        TelegramSender(self.telegram_token, self.telegram_chat_id)(text)
     
     def optimize_parameters(self, symbol, historical_data):
+        import numpy as np
+        
         # Mock optimization
         best_params = {
             'tp_percentage': np.random.uniform(1, 5),
@@ -103,6 +104,11 @@ class TradingBot:
         return best_params
 
 bot = TradingBot()
+scheduler = Scheduler()
+scheduler.add('scanner', bot.scan_signals,
+              interval=float(os.environ.get('SCANNER_INTERVAL', 60)),
+              jitter=float(os.environ.get('SCANNER_JITTER', 5)))
+init_scheduler(app, scheduler)
 
 @app.route('/')
 def index():
@@ -123,15 +129,12 @@ def backtest():
 
 @app.route('/scanner/start', methods=['POST'])
 def start_scanner():
-    bot.scanner_active = True
-    scanner_thread = threading.Thread(target=bot.scan_signals)
-    scanner_thread.daemon = True
-    scanner_thread.start()
-    return jsonify({'status': 'Scanner started'})
+    started = scheduler.start('scanner')
+    return jsonify({'status': 'Scanner started' if started else 'Scanner already running'})
 
 @app.route('/scanner/stop', methods=['POST'])
 def stop_scanner():
-    bot.scanner_active = False
+    scheduler.stop('scanner')
     return jsonify({'status': 'Scanner stopped'})
 
 @app.route('/optimize', methods=['POST'])
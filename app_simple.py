@@ -1,16 +1,22 @@
 from flask import Flask, render_template, request, jsonify
 import json
+import logging
+import os
 import random
 from datetime import datetime, timedelta
-import threading
-import time
 from free_api import FreeDataProvider
+from log_config import setup_logging
+from serialization import init_serialization
+from scheduler import Scheduler, init_scheduler
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+init_serialization(app)
 
 class TradingBot:
     def __init__(self):
-        self.scanner_active = False
         self.telegram_token = ""
         self.telegram_chat_id = ""
         self.data_provider = FreeDataProvider()
@@ -150,22 +156,21 @@ class TradingBot:
             'max_loss': min([t['profit'] for t in trades]) if trades else 0
         }
     
-    def scan_signals(self):
-        while self.scanner_active:
-            # Get real-time prices and detect signals
-            top_cryptos = self.data_provider.get_top_cryptos()
-            
-            for crypto in top_cryptos[:5]:  # Check top 5
-                if abs(crypto['change_24h']) > 5:  # Significant movement
-                    signal = {
-                        'symbol': crypto['symbol'],
-                        'side': 'long' if crypto['change_24h'] > 0 else 'short',
-                        'price': crypto['price'],
-                        'change': crypto['change_24h']
-                    }
-                    print(f"Signal detected: {signal}")
-            
-            time.sleep(300)  # Check every 5 minutes
+    def scan_signals(self, cancel):
+        # One pass; the scheduler runs it every SCANNER_INTERVAL seconds (default 5 minutes)
+        top_cryptos = self.data_provider.get_top_cryptos()
+        
+        for crypto in top_cryptos[:5]:  # Check top 5
+            if cancel.is_set():
+                break
+            if abs(crypto['change_24h']) > 5:  # Significant movement
+                signal = {
+                    'symbol': crypto['symbol'],
+                    'side': 'long' if crypto['change_24h'] > 0 else 'short',
+                    'price': crypto['price'],
+                    'change': crypto['change_24h']
+                }
+                logger.info("Signal detected: %s", signal)
     
     def optimize_parameters(self, symbol):
         return {
@@ -176,6 +181,11 @@ class TradingBot:
         }
 
 bot = TradingBot()
+scheduler = Scheduler()
+scheduler.add('scanner', bot.scan_signals,
+              interval=float(os.environ.get('SCANNER_INTERVAL', 300)),
+              jitter=float(os.environ.get('SCANNER_JITTER', 15)))
+init_scheduler(app, scheduler)
 
 @app.route('/')
 def index():
@@ -191,16 +201,38 @@ def backtest():
         float(data['balance']),
         float(data['leverage'])
     )
+    
+    # Resampled trade paths show how robust the result is; "monte_carlo": false skips it
+    options = data.get('monte_carlo', {})
+    if options is not False:
+        from monte_carlo import monte_carlo, trade_returns  # numpy is only loaded once a backtest runs
+        options = options if isinstance(options, dict) else {}
+        simulations = options.get('simulations', int(os.environ.get('MONTE_CARLO_SIMULATIONS', 10000)))
+        seed = options.get('seed')
+        if not isinstance(simulations, int) or isinstance(simulations, bool) or simulations <= 0:
+            return jsonify({'error': 'monte_carlo.simulations must be a positive integer'}), 400
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+            return jsonify({'error': 'monte_carlo.seed must be a non-negative integer'}), 400
+        try:
+            result['monte_carlo'] = monte_carlo(
+                trade_returns(result['trades'], float(data['balance'])),
+                float(data['balance']),
+                simulations=min(simulations, 100000),
+                method=options.get('method', 'bootstrap'),
+                seed=seed
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     return jsonify(result)
 
 @app.route('/scanner/start', methods=['POST'])
 def start_scanner():
-    bot.scanner_active = True
-    return jsonify({'status': 'Scanner started'})
+    started = scheduler.start('scanner')
+    return jsonify({'status': 'Scanner started' if started else 'Scanner already running'})
 
 @app.route('/scanner/stop', methods=['POST'])
 def stop_scanner():
-    bot.scanner_active = False
+    scheduler.stop('scanner')
     return jsonify({'status': 'Scanner stopped'})
 
 @app.route('/optimize', methods=['POST'])
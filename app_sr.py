@@ -1,15 +1,49 @@
 from flask import Flask, render_template, request, jsonify
 import json
+import os
 from datetime import datetime
 from support_resistance_simple import SupportResistanceAnalyzer
+from metrics import init_app
+from profiling import init_profiling
+from log_config import setup_logging
+from serialization import init_serialization
+from response_cache import ResponseCache, cache_warmer
+from scheduler import Scheduler, init_scheduler
+from universe import iter_coins, universe_filters
+from live_prices import PriceTable, start_live_prices
+from projection import ANALYSIS_COLUMNS, SCAN_COLUMNS, analysis_rows, scan_rows, shape
 import threading
 import time
 
+setup_logging()
 app = Flask(__name__)
-analyzer = SupportResistanceAnalyzer()
+init_serialization(app)
+init_app(app)
+init_profiling(app)
+response_cache = ResponseCache()
+price_table = PriceTable()
+analyzer = SupportResistanceAnalyzer(price_table=price_table)
+live_prices = None
 scanning = False
 scan_thread = None
 
+def _start_live_prices():
+    global live_prices
+    live_prices = start_live_prices(analyzer.get_top_coins(50), price_table)
+
+# LIVE_PRICES=1 streams exchange tickers into price_table instead of polling /simple/price
+if os.environ.get('LIVE_PRICES', '').lower() in ('1', 'true', 'yes'):
+    threading.Thread(target=_start_live_prices, name='live-prices-start', daemon=True).start()
+
+# CACHE_WARM=1 keeps CACHE_WARM_PATHS in the response cache; /jobs/cache-warmer/start does the same at runtime
+scheduler = Scheduler()
+scheduler.add('cache-warmer',
+              cache_warmer(app, os.environ.get('CACHE_WARM_PATHS', '/get-coins').split(',')),
+              interval=float(os.environ.get('CACHE_WARM_INTERVAL', 12)),
+              jitter=float(os.environ.get('CACHE_WARM_JITTER', 1)),
+              start=os.environ.get('CACHE_WARM', '').lower() in ('1', 'true', 'yes'))
+init_scheduler(app, scheduler)
+
 @app.route('/')
 def index():
     return render_template('sr_index.html')
@@ -21,10 +55,17 @@ def scan_opportunities():
     max_resistance_dist = request.args.get('resistance_dist', 3, type=float)
     timeframes = request.args.get('timeframes', '').split(',') if request.args.get('timeframes') else None
     
+    # universe=, min_market_cap=, min_volume= and category= stream a wider universe than the top coins
+    filters = universe_filters(request.args)
+    coins = iter_coins(analyzer.source, **filters) if filters else None
+    
     scanning = True
-    opportunities = analyzer.scan_all_coins(max_support_dist, max_resistance_dist, timeframes, not scanning)
+    opportunities = analyzer.scan_all_coins(max_support_dist, max_resistance_dist, timeframes, not scanning, coins=coins)
     scanning = False
-    return jsonify(opportunities)
+    payload, error = shape(opportunities, request.args, scan_rows, SCAN_COLUMNS)
+    if error:
+        return jsonify({'error': error})
+    return jsonify(payload)
 
 @app.route('/stop-scan', methods=['POST'])
 def stop_scan():
@@ -33,6 +74,7 @@ def stop_scan():
     return jsonify({'status': 'Scan stopped'})
 
 @app.route('/analyze-coin/<coin_id>')
+@response_cache.cached()
 def analyze_coin(coin_id):
     timeframes = request.args.get('timeframes', '').split(',') if request.args.get('timeframes') else None
     
@@ -44,9 +86,20 @@ def analyze_coin(coin_id):
         return jsonify({'error': 'Coin not found'})
     
     analysis = analyzer.analyze_coin(coin_id, coin_info['name'], coin_info['symbol'], timeframes)
-    return jsonify(analysis)
+    payload, error = shape(analysis, request.args, analysis_rows, ANALYSIS_COLUMNS)
+    if error:
+        return jsonify({'error': error})
+    return jsonify(payload)
+
+@app.route('/live-prices')
+def get_live_prices():
+    return jsonify({
+        'prices': price_table.snapshot(),
+        'feeds': live_prices.status() if live_prices else {}
+    })
 
 @app.route('/get-coins')
+@response_cache.cached()
 def get_coins():
     coins = analyzer.get_top_coins(50)
     result = []
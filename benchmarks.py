@@ -0,0 +1,390 @@
+"""Offline micro-benchmarks for the analysis, strategy and backtest hot paths.
+
+Every benchmark runs on a seeded synthetic price series, so numbers from two
+commits are directly comparable:
+
+    python benchmarks.py --output before.json
+    (change something)
+    python benchmarks.py --output after.json --compare before.json
+
+--scan-scale 100,1000,5000 additionally runs scan_all_coins over a
+SyntheticMarket universe of each size and reports wall time, CPU time, peak
+RSS and per-coin latency percentiles; --scan-workers N runs the sharded
+multi-process scan instead (CPU time then only counts the parent and
+per-coin percentiles are not reported). --payload 100,1000 times encoding a
+/scan-opportunities response of that many coins with each JSON encoder and
+reports its size raw, gzipped and (if brotli is installed) brotli-compressed.
+--startup app_sr,api starts each web entry point in fresh interpreters and
+reports process start, import time and time to the first request (GET /),
+plus which heavy libraries the import pulled in.
+
+Reported per benchmark and size: best wall time over --repeat runs, peak
+traced memory, and the blocks and KB allocated by the call that are still
+held when it returns, its result included (from a separate tracemalloc
+run, so tracing doesn't skew the timing).
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+def synthetic_prices(n, seed=42, start=100.0):
+    """Geometric random walk with a slow cycle, so there are pivots to find"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01, n) + 0.002 * np.sin(np.arange(n) / 50)
+    return start * np.exp(np.cumsum(returns))
+
+class StubResponse:
+    def __init__(self, data):
+        self.status_code = 200
+        self.headers = {}
+        self._data = data
+
+    def json(self):
+        return self._data
+
+class StubSource:
+    """Data source serving one prebuilt series for every request, with no parsing cost"""
+
+    def __init__(self, prices):
+        now_ms = int(time.time() * 1000)
+        self.chart = {'prices': [[now_ms - (len(prices) - i) * 3600000, float(p)] for i, p in enumerate(prices)]}
+        self.price = float(prices[-1])
+
+    def get(self, url, params=None, timeout=10):
+        if url.endswith('/simple/price'):
+            return StubResponse({params['ids']: {'usd': self.price}})
+        return StubResponse(self.chart)
+
+# --- benchmarks -------------------------------------------------------------
+# Each setup(n) builds its inputs outside the measurement and returns the
+# zero-argument callable to time.
+
+def setup_find_support_resistance(n):
+    from support_resistance import SupportResistanceAnalyzer
+    analyzer = SupportResistanceAnalyzer(StubSource([1.0]))
+    prices = synthetic_prices(n).tolist()
+    return lambda: analyzer.find_support_resistance(prices)
+
+def setup_find_volume_profile_levels(n):
+    from support_resistance import SupportResistanceAnalyzer
+    analyzer = SupportResistanceAnalyzer(StubSource([1.0]))
+    prices = synthetic_prices(n)
+    return lambda: analyzer.find_volume_profile_levels(prices)
+
+def setup_analyze_coin(n):
+    from support_resistance import SupportResistanceAnalyzer
+    analyzer = SupportResistanceAnalyzer(StubSource(synthetic_prices(n)))
+    return lambda: analyzer.analyze_coin('bitcoin', 'Bitcoin', 'btc')
+
+def setup_generate_recommendations(n):
+    from support_resistance import SupportResistanceAnalyzer
+    analyzer = SupportResistanceAnalyzer(StubSource(synthetic_prices(n)))
+    analysis = analyzer.analyze_coin('bitcoin', 'Bitcoin', 'btc')
+    return lambda: analyzer.generate_recommendations(analysis)
+
+def setup_walk_forward_backtest(n):
+    from support_resistance import SupportResistanceAnalyzer
+    from walk_forward import WalkForwardBacktest
+    prices = synthetic_prices(n)
+    backtest = WalkForwardBacktest(SupportResistanceAnalyzer(StubSource(prices)), '1h')
+    return lambda: backtest.run(prices)
+
+def setup_monte_carlo(n):
+    from monte_carlo import monte_carlo
+    returns = np.random.default_rng(42).normal(0.002, 0.02, n)
+    return lambda: monte_carlo(returns, 1000.0, simulations=10000, seed=42)
+
+def _ohlc_frame(n):
+    import pandas as pd
+    close = synthetic_prices(n)
+    return pd.DataFrame({'close': close}, index=pd.RangeIndex(n))
+
+def setup_calculate_indicators(n):
+    from strategies import TradingStrategy
+    strategy = TradingStrategy()
+    df = _ohlc_frame(n)
+    return lambda: strategy.calculate_indicators(df.copy())
+
+def setup_generate_signals(n):
+    from strategies import TradingStrategy
+    strategy = TradingStrategy()
+    df = _ohlc_frame(n)
+    return lambda: strategy.generate_signals(df.copy())
+
+def setup_backtest_strategy(n):
+    from strategies import TradingStrategy
+    strategy = TradingStrategy()
+    df = _ohlc_frame(n)
+    return lambda: strategy.backtest_strategy(df.copy())
+
+def setup_parameter_optimizer(n):
+    from strategies import ParameterOptimizer
+    optimizer = ParameterOptimizer(_ohlc_frame(n))
+    # 16 combinations instead of the default 256 keeps one run in seconds
+    grid = {'tp_percent': [1.0, 3.0], 'sl_percent': [0.5, 1.5], 'rsi_period': [10, 14], 'ma_period': [15, 25]}
+    return lambda: optimizer.optimize(grid)
+
+def setup_trading_bot_backtest(n):
+    from app_simple import TradingBot
+    from free_api import FreeDataProvider
+    bot = TradingBot()
+    bot.data_provider = FreeDataProvider(StubSource(synthetic_prices(n)))
+    start = datetime(2024, 1, 1)
+    end = datetime(2024, 12, 31)
+    return lambda: bot.backtest('BTCUSDT', start, end, 1000.0, 10.0)
+
+# name -> (setup, largest size worth running)
+BENCHMARKS = {
+    'find_support_resistance': (setup_find_support_resistance, 1000000),
+    'find_volume_profile_levels': (setup_find_volume_profile_levels, 1000000),
+    'analyze_coin': (setup_analyze_coin, 100000),
+    'generate_recommendations': (setup_generate_recommendations, 100000),
+    'walk_forward_backtest': (setup_walk_forward_backtest, 100000),
+    'calculate_indicators': (setup_calculate_indicators, 1000000),
+    'generate_signals': (setup_generate_signals, 100000),
+    'backtest_strategy': (setup_backtest_strategy, 100000),
+    'parameter_optimizer': (setup_parameter_optimizer, 10000),
+    'trading_bot_backtest': (setup_trading_bot_backtest, 1000000),
+    'monte_carlo': (setup_monte_carlo, 10000),
+}
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    # Per-file growth between the snapshots, taken while the result is still alive
+    grown = [stat for stat in after.compare_to(before, 'filename') if stat.size_diff > 0]
+    return {
+        'wall_ms': round(min(timings) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+        'alloc_blocks': sum(stat.count_diff for stat in grown),
+        'alloc_kb': round(sum(stat.size_diff for stat in grown) / 1024, 1)
+    }
+
+def run(names, sizes, repeat):
+    results = []
+    for name in names:
+        setup, max_size = BENCHMARKS[name]
+        for n in sizes:
+            if n > max_size:
+                continue
+            try:
+                fn = setup(n)
+            except ImportError as e:
+                print(f"{name:<26} skipped: {e}")
+                break
+            row = {'benchmark': name, 'size': n}
+            row.update(measure(fn, repeat))
+            results.append(row)
+            print(f"{name:<26} n={n:<9} {row['wall_ms']:>12.3f} ms {row['peak_kb']:>12.1f} KB peak "
+                  f"{row['alloc_blocks']:>9} blocks {row['alloc_kb']:>10.1f} KB allocated")
+    return results
+
+def scan_scale(coin_counts, days, timeframes, workers=1):
+    """Scaling curve of scan_all_coins over a synthetic universe"""
+    from support_resistance import SupportResistanceAnalyzer
+    from synthetic_market import SyntheticMarket
+
+    results = []
+    for n in coin_counts:
+        market = SyntheticMarket(n_coins=n, days=days)
+        analyzer = SupportResistanceAnalyzer(market)
+        coins = market.coins()
+
+        latencies = []
+        analyze = analyzer.analyze_coin
+        def timed_analyze(*args, **kwargs):
+            start = time.perf_counter()
+            result = analyze(*args, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            return result
+        analyzer.analyze_coin = timed_analyze
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        opportunities = analyzer.scan_all_coins(10, 8, timeframes, coins=coins, workers=workers)
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+        row = {
+            'benchmark': 'scan_all_coins',
+            'size': n,
+            'days': days,
+            'workers': workers,
+            'wall_ms': round(wall * 1000, 1),
+            'cpu_ms': round(cpu * 1000, 1),
+            'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'coin_p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 2) if latencies else None,
+            'coin_p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 2) if latencies else None,
+            'opportunities': len(opportunities)
+        }
+        results.append(row)
+        print(f"scan_all_coins coins={n:<6} {row['wall_ms']:>10.1f} ms wall {row['cpu_ms']:>10.1f} ms cpu "
+              f"{row['peak_rss_kb']:>9} KB rss  p50 {row['coin_p50_ms']} ms  p95 {row['coin_p95_ms']} ms")
+    return results
+
+def scan_payload(n, days=30, sample=50):
+    """A /scan-opportunities style payload with n entries, tiled from a real scan of a few coins"""
+    from support_resistance import SupportResistanceAnalyzer
+    from synthetic_market import SyntheticMarket
+
+    market = SyntheticMarket(n_coins=min(n, sample), days=days)
+    analyzer = SupportResistanceAnalyzer(market)
+    # Distances wide enough that every analysed coin makes it into the payload
+    entries = analyzer.scan_all_coins(100, 100, ['1h', '4h', '1d'], coins=market.coins())
+    return [entries[i % len(entries)] for i in range(n)]
+
+def payload_sizes(coin_counts, repeat):
+    """Encode time and bytes on the wire of a scan response, per encoder and compression"""
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from serialization import FastJSONProvider, brotli, compress, json_default, orjson
+
+    app = Flask(__name__)
+    encoders = {'json': DefaultJSONProvider(app)}
+    encoders['json'].default = json_default
+    if orjson is not None:
+        encoders['orjson'] = FastJSONProvider(app)
+
+    results = []
+    for n in coin_counts:
+        payload = scan_payload(n)
+        for name, provider in encoders.items():
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                body = provider.response(payload).get_data()
+                best = min(best, time.perf_counter() - start)
+            row = {'benchmark': f'encode_{name}', 'size': n, 'wall_ms': round(best * 1000, 3),
+                   'raw_kb': round(len(body) / 1024, 1)}
+            for encoding in ['gzip', 'br'] if brotli is not None else ['gzip']:
+                start = time.perf_counter()
+                row[f'{encoding}_kb'] = round(len(compress(body, encoding)) / 1024, 1)
+                row[f'{encoding}_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            results.append(row)
+            wire = '  '.join(f"{k} {v}" for k, v in row.items() if k.endswith(('_kb', '_ms')) and k != 'wall_ms')
+            print(f"{row['benchmark']:<26} coins={n:<7} {row['wall_ms']:>10.3f} ms  {wire}")
+    return results
+
+# Web entry points for --startup: name -> file, relative to this directory
+ENTRY_POINTS = {
+    'app_sr': 'app_sr.py',
+    'app_simple': 'app_simple.py',
+    'app': 'app.py',
+    'api': os.path.join('api', 'index.py'),
+}
+
+HEAVY_MODULES = ['numpy', 'pandas', 'talib', 'pandas_ta']
+
+# Runs in a fresh interpreter: import the entry point, serve GET / once, report timings
+_STARTUP_PROBE = '''
+import importlib.util, json, sys, time
+start = time.perf_counter()
+path, heavy = sys.argv[1], sys.argv[2].split(',')
+spec = importlib.util.spec_from_file_location('entry_point', path)
+module = sys.modules['entry_point'] = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+status = module.app.test_client().get('/').status_code
+served = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'first_request_ms': (served - start) * 1000,
+                  'status': status, 'heavy': [m for m in heavy if m in sys.modules]}))
+'''
+
+def startup(names, repeat):
+    """Cold start of each web entry point, median over repeat fresh processes"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for name in names:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, '-c', _STARTUP_PROBE, os.path.join(here, ENTRY_POINTS[name]),
+                                  ','.join(HEAVY_MODULES)], cwd=here, capture_output=True, text=True, check=True)
+            probe = json.loads(out.stdout.strip().splitlines()[-1])
+            probe['process_ms'] = (time.perf_counter() - start) * 1000
+            runs.append(probe)
+        row = {'benchmark': f'startup_{name}', 'size': 1}
+        for key in ['process_ms', 'import_ms', 'first_request_ms']:
+            row[key] = round(float(np.median([r[key] for r in runs])), 1)
+        # compare() looks at wall_ms; for a cold start that is the time to the first response
+        row['wall_ms'] = row['first_request_ms']
+        row['status'] = runs[-1]['status']
+        row['heavy_modules'] = runs[-1]['heavy']
+        results.append(row)
+        print(f"{row['benchmark']:<26} {row['process_ms']:>8.1f} ms process {row['import_ms']:>8.1f} ms import "
+              f"{row['first_request_ms']:>8.1f} ms first request  heavy: {', '.join(row['heavy_modules']) or '-'}")
+    return results
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['benchmark'], r['size']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path}:")
+    for row in results:
+        old = baseline.get((row['benchmark'], row['size']))
+        if not old or not old['wall_ms']:
+            continue
+        ratio = row['wall_ms'] / old['wall_ms']
+        print(f"{row['benchmark']:<26} n={row['size']:<9} {old['wall_ms']:>10.3f} -> {row['wall_ms']:>10.3f} ms  x{ratio:.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument('--only', default='', help='comma separated benchmark names')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--compare', help='JSON file from an earlier run')
+    parser.add_argument('--scan-scale', default='', help='comma separated universe sizes for scan_all_coins')
+    parser.add_argument('--scan-days', type=int, default=365, help='days of hourly history per synthetic coin')
+    parser.add_argument('--scan-timeframes', default='1h,4h,1d')
+    parser.add_argument('--scan-workers', type=int, default=1, help='processes for the sharded scan (1 = sequential)')
+    parser.add_argument('--payload', default='', help='comma separated coin counts for the scan response encoding benchmark')
+    parser.add_argument('--startup', default='', help=f"comma separated entry points to cold start ({','.join(ENTRY_POINTS)}, or all)")
+    args = parser.parse_args(argv)
+
+    names = [n for n in args.only.split(',') if n] or list(BENCHMARKS)
+    sizes = [int(s) for s in args.sizes.split(',')]
+    results = run(names, sizes, args.repeat) if args.only or not (args.scan_scale or args.payload or args.startup) else []
+    if args.scan_scale:
+        coin_counts = [int(s) for s in args.scan_scale.split(',')]
+        results += scan_scale(coin_counts, args.scan_days, args.scan_timeframes.split(','), args.scan_workers)
+    if args.payload:
+        results += payload_sizes([int(s) for s in args.payload.split(',')], args.repeat)
+    if args.startup:
+        entry_points = list(ENTRY_POINTS) if args.startup == 'all' else args.startup.split(',')
+        results += startup(entry_points, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'commit': git_commit(), 'python': sys.version.split()[0], 'results': results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return results
+
+if __name__ == '__main__':
+    main()
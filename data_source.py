@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+import requests
+
+from metrics import UPSTREAM_RESPONSES
+from rate_limiter import coingecko_get
+
+class RecordedResponse:
+    """The parts of requests.Response the analyzers use"""
+
+    def __init__(self, status_code, text, headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} recorded error")
+
+class ReplayMiss(requests.RequestException):
+    """Replay mode was asked for a request that was never recorded"""
+
+def request_key(url, params=None):
+    canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+class LiveDataSource:
+    """Talks to the real APIs; CoinGecko goes through the shared rate limiter"""
+    mode = 'live'
+
+    def get(self, url, params=None, timeout=10):
+        host = urlparse(url).netloc
+        try:
+            if 'api.coingecko.com' in url:
+                response = coingecko_get(url, params=params, timeout=timeout)
+            else:
+                response = requests.get(url, params=params, timeout=timeout)
+        except requests.RequestException:
+            UPSTREAM_RESPONSES.inc(host=host, status='error')
+            raise
+        UPSTREAM_RESPONSES.inc(host=host, status=response.status_code)
+        return response
+
+class RecordingDataSource:
+    """Passes requests to another source and saves every response to disk"""
+    mode = 'record'
+
+    def __init__(self, path, source=None):
+        self.path = path
+        self.source = source or LiveDataSource()
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def get(self, url, params=None, timeout=10):
+        response = self.source.get(url, params=params, timeout=timeout)
+        record = {
+            'url': url,
+            'params': params or {},
+            'status_code': response.status_code,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() == 'retry-after'},
+            'body': response.text
+        }
+        file_path = os.path.join(self.path, request_key(url, params) + '.json')
+        with self._lock:
+            with open(file_path, 'w') as f:
+                json.dump(record, f)
+        return response
+
+class ReplayDataSource:
+    """Serves responses from a recording; unknown requests raise ReplayMiss"""
+    mode = 'replay'
+
+    def __init__(self, path):
+        self.path = path
+        self._cache = {}
+
+    def get(self, url, params=None, timeout=10):
+        key = request_key(url, params)
+        record = self._cache.get(key)
+        if record is None:
+            file_path = os.path.join(self.path, key + '.json')
+            if not os.path.exists(file_path):
+                raise ReplayMiss(f"No recording for {url} {params or {}}")
+            with open(file_path) as f:
+                record = json.load(f)
+            self._cache[key] = record
+        return RecordedResponse(record['status_code'], record['body'], record.get('headers'))
+
+def get_data_source(mode=None, path=None):
+    """Build the source selected by SR_DATA_MODE (live/record/replay) and SR_DATA_DIR"""
+    mode = mode or os.environ.get('SR_DATA_MODE', 'live')
+    path = path or os.environ.get('SR_DATA_DIR', 'recordings')
+    if mode == 'record':
+        return RecordingDataSource(path)
+    if mode == 'replay':
+        return ReplayDataSource(path)
+    if mode == 'live':
+        return LiveDataSource()
+    raise ValueError(f"Unknown data mode: {mode}")
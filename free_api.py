@@ -1,10 +1,13 @@
 import requests
+import random
 import time
 from datetime import datetime, timedelta
+from data_source import get_data_source
 
 class FreeDataProvider:
-    def __init__(self):
+    def __init__(self, data_source=None):
         self.coingecko_base = "https://api.coingecko.com/api/v3"
+        self.source = data_source or get_data_source()
         self.alpha_vantage_key = "demo"  # Free demo key
         self.alpha_vantage_base = "https://www.alphavantage.co/query"
     
@@ -26,7 +29,7 @@ class FreeDataProvider:
             url = f"{self.coingecko_base}/simple/price"
             params = {'ids': coin_id, 'vs_currencies': 'usd'}
             
-            response = requests.get(url, params=params)
+            response = self.source.get(url, params=params)
             data = response.json()
             
             return data[coin_id]['usd']
@@ -46,7 +49,7 @@ class FreeDataProvider:
             url = f"{self.coingecko_base}/coins/{coin_id}/market_chart"
             params = {'vs_currency': 'usd', 'days': days}
             
-            response = requests.get(url, params=params)
+            response = self.source.get(url, params=params)
             data = response.json()
             
             # Convert to OHLCV format
@@ -81,7 +84,7 @@ class FreeDataProvider:
                 'page': 1
             }
             
-            response = requests.get(url, params=params)
+            response = self.source.get(url, params=params)
             data = response.json()
             
             return [{
@@ -0,0 +1,217 @@
+"""Live prices pushed from exchange WebSocket streams into an in-memory table.
+
+One long-lived connection per exchange feeds a PriceTable that the analyzers
+read instead of calling /simple/price for every coin. A connection is made
+by connect(url), which returns an object with send(text), recv() -> text and
+close(). That is the shape of websocket-client's create_connection, the
+default when it is installed. Tests and local stand-ins pass their own
+factory.
+
+    table = PriceTable()
+    service = LivePriceService(table, [BinanceFeed(symbols)])
+    service.start()
+    table.get('bitcoin', max_age=10)
+"""
+import importlib.util
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+def default_connect(url, timeout=10):
+    try:
+        from websocket import create_connection
+    except ImportError:
+        raise RuntimeError("live prices need the websocket-client package or a connect= factory")
+    return create_connection(url, timeout=timeout)
+
+class PriceTable:
+    """Latest price per coin id. Reads are a single dict lookup and take no lock."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._prices = {}
+
+    def update(self, coin_id, price, source):
+        # Replacing the whole tuple keeps readers from seeing half an update
+        self._prices[coin_id] = (price, self.clock(), source)
+
+    def get(self, coin_id, max_age=None):
+        """The latest price, or None if there is none or it is older than max_age seconds"""
+        entry = self._prices.get(coin_id)
+        if entry is None or (max_age is not None and self.clock() - entry[1] > max_age):
+            return None
+        return entry[0]
+
+    def snapshot(self):
+        now = self.clock()
+        return {coin_id: {'price': price, 'age_s': round(now - updated, 3), 'source': source}
+                for coin_id, (price, updated, source) in list(self._prices.items())}
+
+    def __len__(self):
+        return len(self._prices)
+
+class ExchangeFeed(ABC):
+    """One exchange stream: where to connect, what to subscribe to and how to read ticks.
+
+    symbols maps the exchange's ticker symbols to CoinGecko coin ids.
+    """
+    name = None
+    url = None
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+
+    @classmethod
+    @abstractmethod
+    def for_coins(cls, coins):
+        """A feed for the exchange's symbols of the given CoinGecko coins"""
+
+    def subscribe_messages(self):
+        return []
+
+    @abstractmethod
+    def parse(self, message):
+        """(coin_id, price) pairs from one raw message"""
+
+class BinanceFeed(ExchangeFeed):
+    """All-market mini tickers, about once a second. USDT pairs stand in for USD."""
+    name = 'binance'
+    url = 'wss://stream.binance.com:9443/ws/!miniTicker@arr'
+
+    @classmethod
+    def for_coins(cls, coins):
+        symbols = {}
+        for coin in coins:
+            symbols.setdefault(f"{coin['symbol'].upper()}USDT", coin['id'])
+        return cls(symbols)
+
+    def parse(self, message):
+        data = json.loads(message)
+        for ticker in data if isinstance(data, list) else [data]:
+            coin_id = self.symbols.get(ticker.get('s'))
+            if coin_id:
+                yield coin_id, float(ticker['c'])
+
+class KrakenFeed(ExchangeFeed):
+    """Kraken v2 ticker channel for the USD pairs of the given coins"""
+    name = 'kraken'
+    url = 'wss://ws.kraken.com/v2'
+
+    @classmethod
+    def for_coins(cls, coins):
+        symbols = {}
+        for coin in coins:
+            symbols.setdefault(f"{coin['symbol'].upper()}/USD", coin['id'])
+        return cls(symbols)
+
+    def subscribe_messages(self):
+        return [json.dumps({'method': 'subscribe',
+                            'params': {'channel': 'ticker', 'symbol': sorted(self.symbols)}})]
+
+    def parse(self, message):
+        data = json.loads(message)
+        if not isinstance(data, dict) or data.get('channel') != 'ticker':
+            return
+        for ticker in data.get('data', []):
+            coin_id = self.symbols.get(ticker.get('symbol'))
+            if coin_id and ticker.get('last') is not None:
+                yield coin_id, float(ticker['last'])
+
+FEEDS = {'binance': BinanceFeed, 'kraken': KrakenFeed}
+
+class LivePriceService:
+    """Keeps one connection per feed open and writes every tick into a PriceTable.
+
+    Each feed runs on its own daemon thread and reconnects with exponential
+    backoff (min_backoff doubling up to max_backoff) when the connection drops.
+    """
+
+    def __init__(self, table, feeds, connect=None, min_backoff=1.0, max_backoff=30.0):
+        self.table = table
+        self.feeds = feeds
+        self.connect = connect or default_connect
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._stop = threading.Event()
+        self._threads = []
+        self._connections = {}
+        self._status = {feed.name: {'connected': False, 'messages': 0, 'updates': 0,
+                                    'reconnects': 0, 'last_error': None} for feed in feeds}
+
+    def start(self):
+        self._stop.clear()
+        for feed in self.feeds:
+            thread = threading.Thread(target=self._run, args=(feed,), name=f"live-{feed.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for connection in list(self._connections.values()):
+            try:
+                connection.close()  # unblocks recv()
+            except Exception:
+                pass
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def status(self):
+        return {name: dict(status) for name, status in self._status.items()}
+
+    def _run(self, feed):
+        status = self._status[feed.name]
+        backoff = self.min_backoff
+        while not self._stop.is_set():
+            try:
+                connection = self.connect(feed.url)
+                self._connections[feed.name] = connection
+                for message in feed.subscribe_messages():
+                    connection.send(message)
+                status['connected'] = True
+                logger.info("Live prices connected to %s", feed.name)
+                backoff = self.min_backoff
+                while not self._stop.is_set():
+                    message = connection.recv()
+                    if not message:
+                        raise ConnectionError("connection closed")
+                    status['messages'] += 1
+                    for coin_id, price in feed.parse(message):
+                        self.table.update(coin_id, price, feed.name)
+                        status['updates'] += 1
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                status['last_error'] = str(e)
+                status['reconnects'] += 1
+                logger.warning("Live prices from %s dropped (%s), reconnecting in %.0fs", feed.name, e, backoff)
+            finally:
+                status['connected'] = False
+                connection = self._connections.pop(feed.name, None)
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+def start_live_prices(coins, table=None, feed_names=None, connect=None):
+    """Start a service for the LIVE_PRICE_FEEDS exchanges (default binance) over the given coins.
+
+    Returns None without starting anything when no connect factory is given
+    and websocket-client isn't installed, rather than retrying forever.
+    """
+    if connect is None and importlib.util.find_spec('websocket') is None:
+        logger.error("Live prices disabled: the websocket-client package is not installed")
+        return None
+    table = table if table is not None else PriceTable()
+    feed_names = feed_names or os.environ.get('LIVE_PRICE_FEEDS', 'binance').split(',')
+    feeds = [FEEDS[name.strip()].for_coins(coins) for name in feed_names if name.strip() in FEEDS]
+    return LivePriceService(table, feeds, connect).start()
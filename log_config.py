@@ -0,0 +1,76 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+_listener = None
+_queue = None
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line, including any extra= fields"""
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in self.RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def parse_levels(spec):
+    """'support_resistance=DEBUG,api.index=WARNING' -> {'support_resistance': 'DEBUG', ...}"""
+    levels = {}
+    for part in (spec or '').split(','):
+        if '=' in part:
+            name, level = part.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def _start_listener():
+    global _listener
+    handler = logging.StreamHandler(sys.stderr)
+    if os.environ.get('LOG_FORMAT', '').lower() == 'json':
+        handler.setFormatter(StructuredFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    _listener = logging.handlers.QueueListener(_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+def setup_logging(level=None, module_levels=None):
+    """Route all logging through a queue that one background thread writes out.
+
+    Request threads only enqueue records, so a slow or blocked stderr never
+    stalls a scan. The root level comes from LOG_LEVEL (default INFO) and
+    per-module levels from LOG_LEVELS, e.g. "support_resistance=DEBUG".
+    LOG_FORMAT=json switches to one JSON object per line. Safe to call more
+    than once; only the first call configures anything.
+    """
+    global _queue
+    if _queue is not None:
+        return
+
+    _queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(_queue)]
+    root.setLevel((level or os.environ.get('LOG_LEVEL', 'INFO')).upper())
+
+    levels = parse_levels(os.environ.get('LOG_LEVELS'))
+    levels.update(module_levels or {})
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _start_listener()
+    atexit.register(lambda: _listener.stop())
+    # Threads don't survive fork (gunicorn --preload), so each worker starts its own writer
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_start_listener)
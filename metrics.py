@@ -0,0 +1,171 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        series = self.series.get(tuple(sorted(labels.items())))
+        return series['count'] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self.series.items()):
+                for bound, count in zip(self.buckets, series['buckets']):
+                    lines.append(f"{self.name}_bucket{_format_labels(key + (('le', bound),))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def counter(self, name, help_text):
+        return self.metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+# Metrics are per process; under gunicorn each worker exposes its own numbers
+registry = Registry()
+
+UPSTREAM_SECONDS = registry.histogram('sr_upstream_seconds', 'Latency of upstream fetch operations')
+UPSTREAM_ERRORS = registry.counter('sr_upstream_errors_total', 'Upstream fetch operations that failed')
+UPSTREAM_RESPONSES = registry.counter('sr_upstream_responses_total', 'Upstream HTTP responses by host and status')
+PROVIDER_SECONDS = registry.histogram('sr_price_provider_seconds', 'Latency of each price provider call')
+STAGE_SECONDS = registry.histogram('sr_stage_seconds', 'Time spent in each analysis stage')
+CACHE_REQUESTS = registry.counter('sr_cache_requests_total', 'Cache lookups by cache and result (hit/miss)')
+HTTP_SECONDS = registry.histogram('sr_http_request_seconds', 'Flask request latency by endpoint and status')
+
+@contextmanager
+def upstream(operation):
+    """Time an upstream fetch and count it as an error if it raises.
+
+    Yields check(response), which also counts a non-200 response as an
+    error and returns whether the response was a 200.
+    """
+    def check(response):
+        if response.status_code != 200:
+            UPSTREAM_ERRORS.inc(operation=operation)
+            return False
+        return True
+
+    start = time.perf_counter()
+    try:
+        yield check
+    except Exception:
+        UPSTREAM_ERRORS.inc(operation=operation)
+        raise
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - start, operation=operation)
+
+def timed_stage(stage):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with STAGE_SECONDS.time(stage=stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+def init_app(app):
+    """Add request timing, serialization timing and a Prometheus /metrics route to a Flask app"""
+    from flask import Response, g, request
+
+    # Wrap whichever provider the app already uses (e.g. serialization.FastJSONProvider)
+    class TimedJSONProvider(type(app.json)):
+        def response(self, *args, **kwargs):
+            with STAGE_SECONDS.time(stage='serialize'):
+                return super().response(*args, **kwargs)
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None and request.endpoint != 'metrics':
+            HTTP_SECONDS.observe(time.perf_counter() - start,
+                                 endpoint=request.endpoint or 'unknown', status=response.status_code)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    return app
@@ -0,0 +1,83 @@
+"""Monte Carlo robustness check of a backtest's trade sequence.
+
+A single backtest is one ordering of one sample of trades. Resampling the
+per-trade returns shows how much of the result is luck:
+
+- bootstrap draws each path's trades with replacement, so the trade mix,
+  final balance and win rate vary;
+- permute shuffles the same trades, so only the order, and with it the
+  drawdown, varies (the final balance is the same product in any order).
+
+Every path is compounded from the starting balance. All simulations run as
+one array computation, in chunks so a long trade list doesn't need
+simulations x trades floats at once.
+"""
+import numpy as np
+
+METHODS = ('bootstrap', 'permute')
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Rows per chunk are chosen so one chunk holds about this many floats
+_CHUNK_CELLS = 1_000_000
+
+def trade_returns(trades, initial_balance):
+    """Each trade's profit as a fraction of the balance it was taken with"""
+    returns = []
+    balance = initial_balance
+    for trade in trades:
+        returns.append(trade['profit'] / balance if balance > 0 else 0.0)
+        balance += trade['profit']
+    return np.array(returns, dtype=float)
+
+def _distribution(values):
+    result = {'mean': round(float(values.mean()), 4), 'std': round(float(values.std()), 4)}
+    for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        result[f'p{p}'] = round(float(value), 4)
+    return result
+
+def _simulate(returns, initial_balance, index):
+    paths = returns[index]
+    # A loss of more than the whole balance ends the path at zero
+    equity = initial_balance * np.cumprod(np.maximum(1 + paths, 0), axis=1)
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=1), initial_balance)
+    drawdown = ((peaks - equity) / peaks).max(axis=1) * 100
+    # Copy the last column so the chunk's equity array can be freed
+    return equity[:, -1].copy(), drawdown, (paths > 0).mean(axis=1) * 100
+
+def monte_carlo(returns, initial_balance, simulations=10000, method='bootstrap', seed=None):
+    """Distributions of final balance, max drawdown (%) and win rate (%) over resampled trade paths.
+
+    returns are per-trade fractions as from trade_returns. Returns None when
+    there are no trades; raises ValueError for an unknown method.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown Monte Carlo method: {method}. Use one of {', '.join(METHODS)}")
+    returns = np.asarray(returns, dtype=float)
+    n = len(returns)
+    if n == 0 or simulations <= 0 or initial_balance <= 0:
+        return None
+
+    rng = np.random.default_rng(seed)
+    rows = max(1, _CHUNK_CELLS // n)
+    finals, drawdowns, win_rates = [], [], []
+    for start in range(0, simulations, rows):
+        count = min(rows, simulations - start)
+        if method == 'bootstrap':
+            index = rng.integers(0, n, size=(count, n))
+        else:
+            index = rng.permuted(np.broadcast_to(np.arange(n), (count, n)), axis=1)
+        final, drawdown, win_rate = _simulate(returns, initial_balance, index)
+        finals.append(final)
+        drawdowns.append(drawdown)
+        win_rates.append(win_rate)
+    final = np.concatenate(finals)
+
+    return {
+        'method': method,
+        'simulations': simulations,
+        'trades': n,
+        'final_balance': _distribution(final),
+        'max_drawdown_pct': _distribution(np.concatenate(drawdowns)),
+        'win_rate': _distribution(np.concatenate(win_rates)),
+        'probability_of_loss': round(float((final < initial_balance).mean()) * 100, 2)
+    }
@@ -0,0 +1,166 @@
+"""Scan a large coin universe on every core.
+
+Fetching stays in the parent, where the rate limiter, single-flight and
+response caches live. The universe is taken in batches of SCAN_BATCH_SIZE
+coins (default one iter_coins page, 250). The parent packs a batch's price
+series into one float64 block of shared memory. Workers receive contiguous,
+rank-ordered shards that hold only offsets into that block. They analyse
+their coins against zero-copy numpy views and return only the coins with
+opportunities.
+
+The parent fetches the next batch while the workers analyse the current
+one. It waits for the batch before that to finish first, so at most two
+batches are in memory, however large the universe. The results are merged
+back in rank order, so the output matches a sequential scan_all_coins.
+
+The pool uses the SCAN_START_METHOD multiprocessing start method if set
+(fork, spawn or forkserver), otherwise the platform default. A pool is
+created per scan; on a big universe its startup is small next to the
+analysis itself.
+"""
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from quotes import QuoteRates
+from results import ScanEntry
+from universe import MAX_PER_PAGE
+
+logger = logging.getLogger(__name__)
+
+SHARDS_PER_WORKER = 4  # smaller shards even out coins with longer histories
+
+_worker = {}
+
+class _NoFetch:
+    """Data source for worker analyzers, which only ever see prefetched prices"""
+    def get(self, url, params=None, timeout=10):
+        raise RuntimeError("scan workers do not fetch")
+
+def _init_worker():
+    from support_resistance import SupportResistanceAnalyzer
+    _worker['analyzer'] = SupportResistanceAnalyzer(_NoFetch())
+
+def _scan_shard(shm_name, size, shard, max_support_distance, max_resistance_distance, engine, quote='usd'):
+    analyzer = _worker['analyzer']
+    shm = shared_memory.SharedMemory(name=shm_name)
+    found = []
+    try:
+        prices = np.ndarray((size,), dtype=np.float64, buffer=shm.buf)
+        for rank, coin, current_price, spans in shard:
+            series, volumes = {}, {}
+            for tf, start, length, has_volumes in spans:
+                series[tf] = prices[start:start + length]
+                if has_volumes:
+                    volumes[tf] = prices[start + length:start + 2 * length]
+            analysis = analyzer.build_analysis(coin['id'], coin['name'], coin['symbol'], current_price,
+                                               series, volumes, engine, quote)
+            coin_opportunities = analyzer.find_opportunities(analysis, max_support_distance, max_resistance_distance)
+            if coin_opportunities:
+                found.append((rank, ScanEntry(coin=analysis, opportunities=coin_opportunities)))
+        # Views into the segment must be gone before it can be closed
+        del prices, series, volumes
+    finally:
+        shm.close()
+    return found
+
+def fetch_universe(analyzer, coins, selected_timeframes=None, quote='usd', rates=None, first_rank=0):
+    """Fetch prices for every coin: (tasks, flat price array).
+
+    Ranks count from first_rank, so batches of one universe keep their order.
+    When the analyzer's engine weighs by volume, each series' volumes follow
+    its prices in the array. Prices and volumes are converted to quote (see
+    quotes.py) before they are packed; coins without rates are left out.
+    """
+    timeframes = selected_timeframes or list(analyzer.timeframes)
+    with_volumes = analyzer.engine == 'volume_profile'
+    rates = rates or QuoteRates(analyzer)
+    tasks, chunks, offset = [], [], 0
+    for rank, coin in enumerate(coins, first_rank):
+        current_price = analyzer.get_current_price(coin['id'])
+        if not current_price:
+            continue
+        series, timestamps, volumes = {}, {}, {}
+        for tf in timeframes:
+            series[tf], timestamps[tf], volumes[tf] = analyzer.get_coin_history(coin['id'], tf)
+        converted = rates.convert(quote, current_price, series, timestamps, volumes)
+        if converted is None:
+            continue
+        current_price, series, volumes = converted
+        spans = []
+        for tf in timeframes:
+            prices, tf_volumes = series[tf], volumes.get(tf, [])
+            has_volumes = with_volumes and len(tf_volumes) == len(prices)
+            spans.append((tf, offset, len(prices), has_volumes))
+            chunks.append(np.asarray(prices, dtype=np.float64))
+            offset += len(prices)
+            if has_volumes:
+                chunks.append(np.asarray(tf_volumes, dtype=np.float64))
+                offset += len(tf_volumes)
+        coin = {'id': coin['id'], 'name': coin['name'], 'symbol': coin['symbol']}
+        tasks.append((rank, coin, current_price, spans))
+    flat = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float64)
+    return tasks, flat
+
+def _batches(coins, size):
+    coins = iter(coins)
+    while True:
+        batch = list(islice(coins, size))
+        if not batch:
+            return
+        yield batch
+
+def _collect(shm, futures):
+    """Results of one batch's shards; its shared memory is released either way"""
+    try:
+        return [item for future in futures for item in future.result()]
+    finally:
+        shm.close()
+        shm.unlink()
+
+def scan_sharded(analyzer, coins, max_support_distance=10, max_resistance_distance=8,
+                 selected_timeframes=None, workers=None, quote='usd', rates=None, batch_size=None):
+    """scan_all_coins across a process pool; same result, in rank order"""
+    workers = workers or os.cpu_count() or 1
+    batch_size = batch_size or int(os.environ.get('SCAN_BATCH_SIZE', MAX_PER_PAGE))
+    rates = rates or QuoteRates(analyzer)
+    logger.info("Scanning on %d processes, %d coins per batch", workers, batch_size)
+
+    context = get_context(os.environ.get('SCAN_START_METHOD') or None)
+    found, in_flight, scanned = [], deque(), 0
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+        try:
+            for batch in _batches(coins, batch_size):
+                tasks, flat = fetch_universe(analyzer, batch, selected_timeframes, quote, rates, first_rank=scanned)
+                scanned += len(batch)
+                if not tasks:
+                    continue
+                shm = shared_memory.SharedMemory(create=True, size=max(flat.nbytes, 1))
+                np.ndarray(flat.shape, dtype=np.float64, buffer=shm.buf)[:] = flat
+                shard_size = max(1, -(-len(tasks) // (workers * SHARDS_PER_WORKER)))
+                futures = [pool.submit(_scan_shard, shm.name, len(flat), tasks[i:i + shard_size],
+                                       max_support_distance, max_resistance_distance, analyzer.engine, quote)
+                           for i in range(0, len(tasks), shard_size)]
+                del flat
+                in_flight.append((shm, futures))
+                # This batch is analysed while the next is fetched; the one before must finish first
+                while len(in_flight) > 1:
+                    found.extend(_collect(*in_flight.popleft()))
+            while in_flight:
+                found.extend(_collect(*in_flight.popleft()))
+        finally:
+            for shm, futures in in_flight:
+                for future in futures:
+                    future.cancel()
+                shm.close()
+                shm.unlink()
+
+    found.sort(key=lambda item: item[0])
+    opportunities = [entry for _, entry in found]
+    logger.info("Scan complete. Scanned %d coins, found %d with opportunities", scanned, len(opportunities))
+    return opportunities
@@ -0,0 +1,122 @@
+import cProfile
+import json
+import os
+import pstats
+import tempfile
+import time
+import uuid
+
+def _func_name(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+def summarize(profiler, top=25, max_depth=8, min_fraction=0.01):
+    """Top functions by cumulative time plus a pruned call tree"""
+    stats = pstats.Stats(profiler)
+    entries = stats.stats  # func -> (primitive calls, calls, own time, cumulative time, callers)
+
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+
+    ranked = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)
+    top_functions = [{
+        'function': _func_name(func),
+        'calls': nc,
+        'own_ms': round(tt * 1000, 3),
+        'cumulative_ms': round(ct * 1000, 3)
+    } for func, (cc, nc, tt, ct, callers) in ranked[:top]]
+
+    # The root is the busiest function that isn't profiler plumbing
+    roots = [func for func, _ in ranked if func[0] != '~']
+    total = entries[roots[0]][3] if roots else 0
+
+    def build(func, depth, seen):
+        cc, nc, tt, ct, callers = entries[func]
+        node = {'function': _func_name(func), 'calls': nc, 'cumulative_ms': round(ct * 1000, 3), 'children': []}
+        if depth < max_depth:
+            children = sorted(callees.get(func, []), key=lambda f: entries[f][3], reverse=True)
+            for child in children:
+                if child in seen or entries[child][3] < total * min_fraction:
+                    continue
+                node['children'].append(build(child, depth + 1, seen | {child}))
+        return node
+
+    return {
+        'total_ms': round(total * 1000, 3),
+        'top_functions': top_functions,
+        'call_tree': build(roots[0], 0, {roots[0]}) if roots else None
+    }
+
+def init_profiling(app, enabled=None, token=None, profile_dir=None):
+    """Profile single requests on demand.
+
+    Off unless PROFILING_ENABLED=1 (or enabled=True). A request opts in with
+    an X-Profile header or a profile= query parameter; if PROFILING_TOKEN is
+    set, that value must equal it. The profile is saved under PROFILE_DIR and
+    the response gets X-Profile-Id / X-Profile-Url headers pointing at it.
+    profile=inline instead wraps a JSON response as {"result", "profile"}.
+    """
+    from flask import abort, g, jsonify, request, send_file
+
+    if enabled is None:
+        enabled = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+    token = token if token is not None else os.environ.get('PROFILING_TOKEN', '')
+    profile_dir = profile_dir or os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'sr_profiles'))
+
+    def requested_mode():
+        value = request.headers.get('X-Profile') or request.args.get('profile')
+        if not value:
+            return None
+        if token and value != token and request.args.get('profile_token') != token:
+            return None
+        return 'inline' if request.args.get('profile') == 'inline' else 'store'
+
+    @app.before_request
+    def _start_profile():
+        if not enabled or request.endpoint == 'get_profile':
+            return
+        mode = requested_mode()
+        if mode:
+            g._profile_mode = mode
+            g._profiler = cProfile.Profile()
+            g._profiler.enable()
+
+    @app.after_request
+    def _finish_profile(response):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+
+        profile_id = uuid.uuid4().hex[:12]
+        summary = summarize(profiler)
+        summary.update({'id': profile_id, 'path': request.full_path, 'created': time.time()})
+
+        os.makedirs(profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(profile_dir, profile_id + '.prof'))
+        with open(os.path.join(profile_dir, profile_id + '.json'), 'w') as f:
+            json.dump(summary, f)
+
+        if g.pop('_profile_mode', None) == 'inline' and response.is_json:
+            response = jsonify({'result': response.get_json(), 'profile': summary})
+        response.headers['X-Profile-Id'] = profile_id
+        response.headers['X-Profile-Url'] = f"/profiles/{profile_id}"
+        return response
+
+    @app.route('/profiles/<profile_id>')
+    def get_profile(profile_id):
+        if not enabled or not profile_id.isalnum():
+            abort(404)
+        if token and token not in (request.headers.get('X-Profile'), request.args.get('profile_token')):
+            abort(404)
+        raw = request.args.get('format') == 'pstats'
+        path = os.path.join(profile_dir, profile_id + ('.prof' if raw else '.json'))
+        if not os.path.exists(path):
+            abort(404)
+        return send_file(path, mimetype='application/octet-stream' if raw else 'application/json')
+
+    return app
@@ -0,0 +1,96 @@
+"""Trim and reshape analysis payloads for clients that only need a few fields.
+
+fields= takes comma separated dotted paths. A path walks into dicts by key and
+applies to every element of a list; '*' matches every key of a dict, which is
+how the per-timeframe dicts are reached:
+
+    fields=coin.symbol,coin.current_price,opportunities
+    fields=current_price,timeframes.*.nearest_support
+
+format=columnar flattens the payload into table rows and returns one array
+per column instead of a list of objects:
+
+    {"fields": ["symbol", "signal"], "count": 2,
+     "columns": {"symbol": ["btc", "eth"], "signal": ["BUY", "SELL"]}}
+"""
+
+from collections.abc import Mapping
+
+# One row per opportunity, as the scan table shows them
+SCAN_COLUMNS = ['coin_id', 'name', 'symbol', 'current_price',
+                'type', 'timeframe', 'signal', 'level', 'distance_pct']
+
+# One row per timeframe of a single coin analysis
+ANALYSIS_COLUMNS = ['timeframe', 'nearest_support', 'nearest_resistance',
+                    'support_distance_pct', 'resistance_distance_pct']
+
+def parse_fields(spec):
+    """'coin.symbol,opportunities' -> {'coin': {'symbol': {}}, 'opportunities': {}}"""
+    tree = {}
+    for path in (spec or '').split(','):
+        node = tree
+        for part in filter(None, path.strip().split('.')):
+            node = node.setdefault(part, {})
+    return tree
+
+def project(data, tree):
+    """Keep only the parts of data named in a parse_fields tree; an empty tree keeps everything"""
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [project(item, tree) for item in data]
+    if not isinstance(data, Mapping):
+        return data
+    result = {}
+    for key, value in data.items():
+        subtree = tree.get(key, tree.get('*'))
+        if subtree is not None:
+            result[key] = project(value, subtree)
+    return result
+
+def scan_rows(scan):
+    for entry in scan:
+        coin = entry['coin']
+        for opportunity in entry['opportunities']:
+            row = {
+                'coin_id': coin['coin_id'],
+                'name': coin['name'],
+                'symbol': coin['symbol'],
+                'current_price': coin['current_price']
+            }
+            row.update(opportunity)
+            yield row
+
+def analysis_rows(analysis):
+    for tf, data in analysis['timeframes'].items():
+        row = {'timeframe': tf}
+        row.update(data)
+        yield row
+
+def columnar(rows, columns):
+    columns = list(columns)
+    data = {column: [] for column in columns}
+    count = 0
+    for row in rows:
+        for column in columns:
+            data[column].append(row.get(column))
+        count += 1
+    return {'fields': columns, 'count': count, 'columns': data}
+
+def shape(data, args, rows, default_columns):
+    """Apply the fields= and format= query parameters to a payload.
+
+    Returns (payload, error); error is a message for an unknown format or
+    column, which the routes report like their other errors.
+    """
+    fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()]
+    fmt = args.get('format', 'json')
+
+    if fmt == 'columnar':
+        unknown = [f for f in fields if f not in default_columns]
+        if unknown:
+            return None, f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(default_columns)}"
+        return columnar(rows(data), fields or default_columns), None
+    if fmt != 'json':
+        return None, f"Unknown format: {fmt}. Use json or columnar"
+    return project(data, parse_fields(','.join(fields))), None
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import deque
+
+class CircuitBreaker:
+    """Closed -> open after failure_threshold failures in a row.
+
+    While open every call is refused without touching the network. After
+    cooldown seconds one trial call is let through (half-open); success
+    closes the breaker, failure opens it for another cooldown.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, cooldown=30.0, clock=time.time):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.trial_started = None
+
+    def allow(self):
+        now = self.clock()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.cooldown:
+                return False
+            self.state = self.HALF_OPEN
+            self.trial_started = None
+
+        if self.state == self.HALF_OPEN:
+            # One trial at a time; a trial that never reported back expires
+            if self.trial_started is not None and now - self.trial_started < self.cooldown:
+                return False
+            self.trial_started = now
+
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+            self.trial_started = None
+
+class ProviderHealth:
+    """Circuit breaker plus a rolling success/latency score for each provider.
+
+    ordered() drops providers whose breaker is open and sorts the rest by
+    score. A provider without history gets a neutral prior (half its calls
+    succeeding, at latency_scale_ms), so it ranks below any provider that
+    has proven fast and reliable; among untried providers the configured
+    order is kept.
+    """
+
+    PRIOR_SUCCESS_RATE = 0.5
+
+    def __init__(self, failure_threshold=3, cooldown=30.0, window=50, latency_scale_ms=1000.0, clock=time.time):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.window = window
+        self.latency_scale_ms = latency_scale_ms
+        self.clock = clock
+        self.breakers = {}
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, name):
+        if name not in self.breakers:
+            self.breakers[name] = CircuitBreaker(self.failure_threshold, self.cooldown, self.clock)
+            self.samples[name] = deque(maxlen=self.window)
+        return self.breakers[name]
+
+    def _stats(self, name):
+        samples = self.samples.get(name)
+        if not samples:
+            return self.PRIOR_SUCCESS_RATE, self.latency_scale_ms
+        success_rate = sum(1 for ok, _ in samples if ok) / len(samples)
+        latencies = [latency for ok, latency in samples if ok]
+        avg_latency = sum(latencies) / len(latencies) if latencies else self.latency_scale_ms
+        return success_rate, avg_latency
+
+    def score(self, name):
+        success_rate, avg_latency = self._stats(name)
+        return success_rate / (1 + avg_latency / self.latency_scale_ms)
+
+    def ordered(self, providers):
+        """Filter and sort (name, func) pairs; returns (usable, skipped_names)"""
+        with self._lock:
+            usable = [p for p in providers if self._breaker(p[0]).allow()]
+            skipped = [p[0] for p in providers if p not in usable]
+            usable.sort(key=lambda p: -self.score(p[0]))
+        return usable, skipped
+
+    def record(self, name, ok, latency_ms, trip=True):
+        """Add a sample; trip=False counts a failure against the score only, not the breaker"""
+        with self._lock:
+            breaker = self._breaker(name)
+            self.samples[name].append((ok, latency_ms))
+            if ok:
+                breaker.record_success()
+            elif trip:
+                breaker.record_failure()
+
+    def status(self):
+        with self._lock:
+            result = {}
+            for name, breaker in self.breakers.items():
+                success_rate, avg_latency = self._stats(name)
+                result[name] = {
+                    'state': breaker.state,
+                    'consecutive_failures': breaker.failures,
+                    'success_rate': round(success_rate, 3),
+                    'avg_latency_ms': round(avg_latency, 1),
+                    'score': round(self.score(name), 3),
+                    'samples': len(self.samples[name])
+                }
+            return result
@@ -0,0 +1,110 @@
+"""Quote currencies other than USD, derived from the USD data.
+
+CoinGecko can price everything in any currency, but asking it for EUR or
+BTC would repeat every price and chart request per currency. Instead the
+analyzer fetches USD once and divides by the quote's own USD price:
+
+- crypto quotes (btc, eth) by the quote coin's USD market_chart for the
+  same timeframe, matched up on timestamps, so BTC-denominated levels
+  reflect BTC's moves over the window as well;
+- fiat quotes by the spot rate from /exchange_rates, one request for all
+  of them, since FX barely moves next to crypto over these windows.
+
+A QuoteRates fetches each rate once and keeps it; a scan uses one for the
+whole universe, single analyses share one for QUOTE_RATE_TTL seconds
+(default 60).
+"""
+import logging
+import time
+
+import numpy as np
+
+from metrics import upstream
+
+logger = logging.getLogger(__name__)
+
+# Crypto quote currency -> CoinGecko id of the coin whose USD series divides the prices
+CRYPTO_QUOTES = {'btc': 'bitcoin', 'eth': 'ethereum'}
+
+class QuoteRates:
+    def __init__(self, analyzer, clock=time.monotonic):
+        self.analyzer = analyzer
+        self.created = clock()
+        self.clock = clock
+        self._fiat = None
+        self._spot = {}
+        self._series = {}
+
+    def age(self):
+        return self.clock() - self.created
+
+    def fiat_rates(self):
+        """USD per unit of each fiat currency CoinGecko knows, from one /exchange_rates call"""
+        if self._fiat is None:
+            try:
+                with upstream('get_exchange_rates'):
+                    response = self.analyzer.source.get(f"{self.analyzer.coingecko_base}/exchange_rates")
+                    rates = response.json()['rates']
+                usd = rates['usd']['value']
+                self._fiat = {name: usd / rate['value'] for name, rate in rates.items()
+                              if rate.get('type') == 'fiat' and rate.get('value')}
+            except Exception as e:
+                logger.warning("Could not fetch exchange rates: %s", e)
+                return {}
+        return self._fiat
+
+    def spot(self, quote):
+        """USD per unit of quote right now, or None if unavailable.
+
+        Raises ValueError for a currency that is neither a crypto quote nor
+        one of the fiat currencies /exchange_rates returned.
+        """
+        if quote == 'usd':
+            return 1.0
+        if self._spot.get(quote) is None:
+            if quote in CRYPTO_QUOTES:
+                self._spot[quote] = self.analyzer.get_current_price(CRYPTO_QUOTES[quote])
+            else:
+                fiat = self.fiat_rates()
+                if fiat and quote not in fiat:
+                    raise ValueError(f"Unknown quote currency: {quote}. Use usd, {', '.join(CRYPTO_QUOTES)} "
+                                     f"or a fiat code such as eur")
+                self._spot[quote] = fiat.get(quote)
+        return self._spot[quote]
+
+    def series(self, quote, timeframe):
+        """(timestamps, USD prices) of a crypto quote over a timeframe"""
+        key = (quote, timeframe)
+        if key not in self._series:
+            prices, timestamps, _ = self.analyzer.get_coin_history(CRYPTO_QUOTES[quote], timeframe)
+            self._series[key] = (np.asarray(timestamps, dtype=float), np.asarray(prices, dtype=float))
+        return self._series[key]
+
+    def convert(self, quote, current_price, series, timestamps, volumes):
+        """(current_price, series, volumes) in quote instead of USD, or None if its rates are unavailable.
+
+        series, timestamps and volumes map timeframe -> list, as from
+        get_coin_history. USD comes back untouched.
+        """
+        if quote == 'usd':
+            return current_price, series, volumes
+        spot = self.spot(quote)
+        if not spot:
+            return None
+        converted, converted_volumes = {}, {}
+        for tf, prices in series.items():
+            if not len(prices):
+                converted[tf] = prices
+                continue
+            if quote in CRYPTO_QUOTES:
+                rate_times, rates = self.series(quote, tf)
+                if not len(rates):
+                    return None
+                rate = np.interp(np.asarray(timestamps[tf], dtype=float), rate_times, rates)
+            else:
+                rate = spot
+            converted[tf] = np.asarray(prices, dtype=float) / rate
+            tf_volumes = (volumes or {}).get(tf)
+            if tf_volumes is not None and len(tf_volumes) == len(prices):
+                converted_volumes[tf] = np.asarray(tf_volumes, dtype=float) / rate
+        return current_price / spot, converted, converted_volumes
@@ -0,0 +1,172 @@
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value):
+    """Return the Retry-After header as seconds, or None if missing/invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket shared by every process on the host.
+
+    The bucket lives in a small SQLite file so all gunicorn workers spend one
+    budget. A 429 halves the refill rate and blocks the bucket until the
+    Retry-After time; each success adds a little of the rate back.
+    """
+
+    def __init__(self, name, rate=0.5, capacity=5, min_rate=0.05, recovery_step=None,
+                 max_retries=5, reconnect_delay=0.2, base_backoff=2.0, max_backoff=60.0, db_path=None):
+        self.name = name
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.capacity = capacity
+        self.recovery_step = recovery_step if recovery_step is not None else rate / 20
+        self.max_retries = max_retries
+        self.reconnect_delay = reconnect_delay
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.db_path = db_path or os.environ.get(
+            'RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'sr_rate_limit.db'))
+        self.clock = time.time
+        self.sleep = time.sleep
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    rate REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0
+                )
+            ''')
+            conn.execute('INSERT OR IGNORE INTO rate_limits (name, tokens, rate, updated) VALUES (?, ?, ?, ?)',
+                         (self.name, self.capacity, self.max_rate, self.clock()))
+            self._local.conn = conn
+        return conn
+
+    def _reserve(self):
+        # Take one token if available, otherwise return how long to wait
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = self.clock()
+            tokens, rate, updated, blocked_until = conn.execute(
+                'SELECT tokens, rate, updated, blocked_until FROM rate_limits WHERE name = ?',
+                (self.name,)).fetchone()
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * rate)
+
+            if now < blocked_until:
+                wait = blocked_until - now
+            elif tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+
+            conn.execute('UPDATE rate_limits SET tokens = ?, updated = ? WHERE name = ?',
+                         (tokens, now, self.name))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def acquire(self):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+    def throttle(self, delay):
+        """Back off after a 429: halve the rate and block until delay has passed"""
+        conn = self._connect()
+        now = self.clock()
+        conn.execute('''
+            UPDATE rate_limits
+            SET rate = MAX(?, rate * 0.5), tokens = 0, updated = ?, blocked_until = MAX(blocked_until, ?)
+            WHERE name = ?
+        ''', (self.min_rate, now, now + delay, self.name))
+
+    def recover(self):
+        conn = self._connect()
+        conn.execute('UPDATE rate_limits SET rate = MIN(?, rate + ?) WHERE name = ? AND rate < ?',
+                     (self.max_rate, self.recovery_step, self.name, self.max_rate))
+
+    def current_rate(self):
+        return self._connect().execute('SELECT rate FROM rate_limits WHERE name = ?', (self.name,)).fetchone()[0]
+
+    def get(self, url, params=None, timeout=10):
+        """requests.get() that waits for a token and retries 429/5xx responses.
+
+        A connection error is retried once after reconnect_delay, enough to
+        ride out a reset connection without stalling on a host that is
+        really unreachable; a second one, or a read timeout, is raised.
+        """
+        reconnected = False
+        for attempt in range(self.max_retries + 1):
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+            self.acquire()
+
+            try:
+                response = requests.get(url, params=params, timeout=timeout)
+            except requests.ConnectionError:
+                if reconnected or attempt == self.max_retries:
+                    raise
+                reconnected = True
+                self.sleep(self.reconnect_delay)
+                continue
+
+            if response.status_code == 429:
+                if attempt == self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                delay = retry_after if retry_after is not None else backoff
+                logger.warning("%s returned 429, backing off %.1fs", self.name, delay)
+                self.throttle(delay)
+                continue
+
+            if response.status_code >= 500:
+                if attempt == self.max_retries:
+                    return response
+                self.sleep(backoff)
+                continue
+
+            self.recover()
+            return response
+
+
+# CoinGecko's free tier allows roughly 30 calls per minute
+coingecko_limiter = RateLimiter(
+    'coingecko',
+    rate=float(os.environ.get('COINGECKO_RATE', 0.5)),
+    capacity=int(os.environ.get('COINGECKO_BURST', 5))
+)
+
+
+def coingecko_get(url, params=None, timeout=10):
+    return coingecko_limiter.get(url, params=params, timeout=timeout)
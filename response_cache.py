@@ -0,0 +1,113 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from metrics import record_cache
+
+# Query parameters that only exist to bust browser caches
+IGNORED_PARAMS = {'t', '_'}
+
+class ResponseCache:
+    """Short-lived server-side cache for read-only Flask views, with ETags.
+
+    Responses are stored per path and query string for ttl seconds (default
+    RESPONSE_CACHE_TTL or 15). Every response carries a strong ETag over its
+    body and Cache-Control: no-cache, so browsers revalidate each time and
+    get an empty 304 when If-None-Match still matches.
+    """
+
+    def __init__(self, ttl=None, max_entries=512):
+        self.ttl = ttl if ttl is not None else float(os.environ.get('RESPONSE_CACHE_TTL', 15))
+        self.max_entries = max_entries
+        self.clock = time.time
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, request):
+        args = sorted((k, v) for k, v in request.args.items(multi=True) if k not in IGNORED_PARAMS)
+        return request.path, tuple(args)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires'] <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def cached(self, ttl=None):
+        """Decorator for GET views.
+
+        Responses containing an 'error' key, or that the view marked
+        Cache-Control: no-store, are not stored.
+        """
+        from flask import make_response, request
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = self._key(request)
+                entry = self._get(key)
+                record_cache('response', entry is not None)
+
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    body = response.get_data()
+                    entry = {
+                        'body': body,
+                        'status': response.status_code,
+                        'mimetype': response.mimetype,
+                        'etag': hashlib.sha256(body).hexdigest()[:32],
+                        'expires': self.clock() + (ttl if ttl is not None else self.ttl)
+                    }
+                    data = response.get_json(silent=True)
+                    entry['no_store'] = 'no-store' in response.headers.get('Cache-Control', '')
+                    if response.status_code == 200 and not (isinstance(data, dict) and 'error' in data) \
+                            and not entry['no_store']:
+                        self._put(key, entry)
+
+                # Compressed representations carry the coding as an ETag suffix ("<etag>-gzip")
+                matched = next((tag for tag in request.if_none_match.as_set()
+                                if tag.split('-', 1)[0] == entry['etag']), None)
+                if matched:
+                    response = make_response('', 304)
+                    response.set_etag(matched)
+                else:
+                    response = make_response(entry['body'], entry['status'])
+                    response.mimetype = entry['mimetype']
+                    response.set_etag(entry['etag'])
+                response.headers['Cache-Control'] = 'no-store' if entry.get('no_store') else 'no-cache'
+                return response
+            return wrapper
+        return decorator
+
+def cache_warmer(app, paths):
+    """Scheduler job that requests paths through the app, so a ResponseCache holds them before users ask.
+
+    Run it a little more often than the cache ttl. The cancel event is
+    checked between paths.
+    """
+    def warm(cancel):
+        client = app.test_client()
+        for path in paths:
+            if cancel.is_set():
+                return
+            client.get(path)
+    return warm
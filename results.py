@@ -0,0 +1,99 @@
+"""Compact result types for analyses and scan opportunities.
+
+A large-universe scan keeps thousands of analyses alive until the response
+is serialized. As plain dicts each one costs a hash table per coin, per
+timeframe and per opportunity, plus a boxed float per support/resistance
+level. These classes use __slots__ and keep level lists in array('d'), which
+stores raw doubles but still behaves like a list (len, truthiness, slicing).
+
+They are read-only Mappings, so existing code that does analysis['timeframes']
+or row.update(opportunity) keeps working. to_dict() gives back the dicts the
+analyzer used to build, so the JSON on the wire carries the same values (a
+round-number level comes back as 500.0 rather than 500);
+serialization.FastJSONProvider calls it for any object that has it.
+"""
+import math
+from array import array
+from collections.abc import Mapping
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+class Record(Mapping):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self.__slots__, args):
+            object.__setattr__(self, name, value)
+        for name, value in kwargs.items():
+            object.__setattr__(self, name, value)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == _plain(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (self.__class__, tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self):
+        return {name: _plain(getattr(self, name)) for name in self.__slots__}
+
+def round_price(price, decimals=None, digits=6):
+    """price to digits significant figures, but never fewer than decimals places.
+
+    With decimals, USD-sized prices round exactly as round(price, decimals)
+    did, while BTC-quoted or sub-cent prices keep their significant digits
+    instead of collapsing to 0.0.
+    """
+    if not price or not math.isfinite(price):
+        return float(price)
+    if decimals is None:
+        return float(f"{price:.{digits}g}")
+    return round(float(price), max(decimals, digits - 1 - math.floor(math.log10(abs(price)))))
+
+def levels(values):
+    """Support/resistance levels as a compact array of doubles"""
+    return array('d', values)
+
+class TimeframeLevels(Record):
+    __slots__ = ('supports', 'resistances', 'nearest_support', 'nearest_resistance',
+                 'support_distance_pct', 'resistance_distance_pct')
+
+class Recommendation(Record):
+    __slots__ = ('type', 'timeframe', 'reason', 'entry_price', 'stop_loss',
+                 'take_profit', 'risk_reward', 'confidence')
+
+class Opportunity(Record):
+    __slots__ = ('type', 'timeframe', 'level', 'distance_pct', 'signal')
+
+class Analysis(Record):
+    """timeframes maps timeframe -> TimeframeLevels; recommendations is a list"""
+    __slots__ = ('coin_id', 'name', 'symbol', 'current_price', 'engine', 'quote', 'timeframes', 'recommendations')
+
+class ScanEntry(Record):
+    __slots__ = ('coin', 'opportunities')
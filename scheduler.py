@@ -0,0 +1,190 @@
+import heapq
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class Job:
+    def __init__(self, name, fn, interval, jitter=0.0, timeout=None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout if timeout is not None else interval
+        self.enabled = False
+        self.generation = 0      # bumped on every start, so stale timer entries are ignored
+        self.due = None          # next slot on the fixed-rate grid
+        self.running = None      # (thread, cancel event, started) while a run is in progress
+        self.runs = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.last_started = None
+        self.last_duration = None
+        self.last_error = None
+
+    def status(self, now, wall_offset):
+        return {
+            'enabled': self.enabled,
+            'running': self.running is not None,
+            'interval': self.interval,
+            'jitter': self.jitter,
+            'timeout': self.timeout,
+            'runs': self.runs,
+            'skipped_overlaps': self.skipped,
+            'timeouts': self.timeouts,
+            'failures': self.failures,
+            'last_started': self.last_started + wall_offset if self.last_started else None,
+            'last_duration': round(self.last_duration, 3) if self.last_duration is not None else None,
+            'last_error': self.last_error,
+            'next_run_in': round(max(self.due - now, 0), 3) if self.enabled and self.due is not None else None
+        }
+
+class Scheduler:
+    """Runs recurring jobs at a fixed rate from one timer thread.
+
+    Slots are interval seconds apart from when a job is started, however
+    long each run takes, so the period doesn't drift. Each run fires up to
+    jitter seconds after its slot to keep instances from hitting upstreams
+    in lockstep. A slot that comes up while the previous run is still going
+    is skipped, not queued. Runs get their own thread and a cancel Event as
+    their only argument. The event is set when the run exceeds timeout
+    (default: the interval) or the job is stopped; jobs are expected to
+    check it between units of work, since Python threads can't be killed.
+    """
+
+    def __init__(self):
+        self.clock = time.monotonic
+        self._jobs = {}
+        self._heap = []
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def add(self, name, fn, interval, jitter=0.0, timeout=None, start=False):
+        with self._cond:
+            self._jobs[name] = Job(name, fn, interval, jitter, timeout)
+        if start:
+            self.start(name)
+        return self._jobs[name]
+
+    def start(self, name):
+        """Enable a job; returns False if it was already running on schedule"""
+        with self._cond:
+            job = self._jobs[name]
+            if job.enabled:
+                return False
+            job.enabled = True
+            job.generation += 1
+            job.due = self.clock()
+            heapq.heappush(self._heap, (job.due, name, job.generation))
+            self._ensure_thread()
+            self._cond.notify()
+        logger.info("Job %s started, every %ss", name, job.interval)
+        return True
+
+    def stop(self, name):
+        with self._cond:
+            job = self._jobs[name]
+            was_enabled = job.enabled
+            job.enabled = False
+            if job.running:
+                job.running[1].set()
+            self._cond.notify()
+        if was_enabled:
+            logger.info("Job %s stopped", name)
+        return was_enabled
+
+    def status(self, name=None):
+        with self._cond:
+            now = self.clock()
+            wall_offset = time.time() - now
+            if name is not None:
+                return self._jobs[name].status(now, wall_offset)
+            return {job.name: job.status(now, wall_offset) for job in self._jobs.values()}
+
+    def __contains__(self, name):
+        return name in self._jobs
+
+    def shutdown(self):
+        for name in list(self._jobs):
+            self.stop(name)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        with self._cond:
+            while True:
+                now = self.clock()
+                self._check_timeouts(now)
+                while self._heap and self._heap[0][0] <= now:
+                    _, name, generation = heapq.heappop(self._heap)
+                    job = self._jobs.get(name)
+                    if job is None or not job.enabled or generation != job.generation:
+                        continue
+                    self._fire(job, now)
+                    job.due += job.interval
+                    while job.due <= now:  # the process was suspended; don't replay missed slots
+                        job.due += job.interval
+                    delay = random.uniform(0, job.jitter) if job.jitter else 0
+                    heapq.heappush(self._heap, (job.due + delay, name, generation))
+                wake = [self._heap[0][0]] if self._heap else []
+                wake += [job.running[2] + job.timeout for job in self._jobs.values()
+                         if job.running and not job.running[1].is_set()]
+                self._cond.wait(max(min(wake) - self.clock(), 0.001) if wake else None)
+
+    def _check_timeouts(self, now):
+        for job in self._jobs.values():
+            if job.running and not job.running[1].is_set() and now - job.running[2] > job.timeout:
+                job.running[1].set()
+                job.timeouts += 1
+                logger.warning("Job %s exceeded its %ss timeout; cancelling", job.name, job.timeout)
+
+    def _fire(self, job, now):
+        if job.running:
+            job.skipped += 1
+            logger.warning("Job %s still running, skipping this slot", job.name)
+            return
+        cancel = threading.Event()
+        thread = threading.Thread(target=self._run, args=(job, cancel), name=f"job-{job.name}", daemon=True)
+        job.running = (thread, cancel, now)
+        job.last_started = now
+        thread.start()
+
+    def _run(self, job, cancel):
+        start = self.clock()
+        error = None
+        try:
+            job.fn(cancel)
+        except Exception as e:
+            error = e
+            logger.exception("Job %s failed", job.name)
+        with self._cond:
+            job.running = None
+            job.runs += 1
+            job.last_duration = self.clock() - start
+            job.last_error = str(error) if error else None
+            if error:
+                job.failures += 1
+            self._cond.notify()
+
+def init_scheduler(app, scheduler):
+    """Add /jobs (status) and /jobs/<name>/start|stop routes for a scheduler"""
+    from flask import abort, jsonify
+
+    @app.route('/jobs')
+    def jobs_status():
+        return jsonify(scheduler.status())
+
+    @app.route('/jobs/<name>/<action>', methods=['POST'])
+    def job_action(name, action):
+        if name not in scheduler or action not in ('start', 'stop'):
+            abort(404)
+        changed = scheduler.start(name) if action == 'start' else scheduler.stop(name)
+        return jsonify({'job': name, 'changed': changed, 'status': scheduler.status(name)})
+
+    return app
@@ -0,0 +1,120 @@
+import gzip
+import logging
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+def json_default(obj):
+    """Encode results.Record objects, numpy values and whatever else Flask knows how to handle"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed.
+
+    Output is the same JSON as the stdlib provider (sorted keys, compact
+    outside debug), except that non-ASCII text is sent as UTF-8 rather than
+    \\u escapes and NaN/Infinity become null. Without orjson, or when called
+    with json.dumps-only arguments, it falls back to the stdlib encoder.
+    """
+
+    default = staticmethod(json_default)
+
+    def _options(self, indent=None):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent=None):
+        if orjson is None:
+            return super().dumps(obj, indent=indent).encode()
+        return orjson.dumps(obj, default=json_default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, kwargs.get('indent')).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+def choose_encoding(accept_encodings):
+    """Best supported content coding for an Accept-Encoding header, or None"""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return accept_encodings.best_match(offered)
+
+def compress(data, encoding, level=6):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=min(level, 9), mtime=0)
+
+def init_serialization(app, min_size=None, level=None):
+    """Use the fast JSON provider and compress responses the client accepts.
+
+    Bodies smaller than COMPRESS_MIN_SIZE bytes (default 1024) are sent as
+    is; below that the headers cost more than the savings. COMPRESS_LEVEL
+    (default 6) applies to gzip and brotli alike. Brotli is only offered
+    when the brotli package is installed. Compressed responses get the
+    coding appended to their ETag so each representation validates
+    separately. Call this before metrics.init_app so serialization is timed.
+    """
+    from flask import request
+
+    min_size = min_size if min_size is not None else int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    level = level if level is not None else int(os.environ.get('COMPRESS_LEVEL', 6))
+
+    app.json = FastJSONProvider(app)
+    # Both are in requirements.txt; say so once if a deployment runs without them
+    if orjson is None:
+        logger.warning("orjson is not installed; JSON responses use the slower stdlib encoder")
+    if brotli is None:
+        logger.warning("brotli is not installed; responses are only gzip-compressed")
+
+    @app.after_request
+    def _compress(response):
+        response.vary.add('Accept-Encoding')
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        data = response.get_data()
+        if encoding is None or len(data) < min_size:
+            return response
+
+        response.set_data(compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
+
+    return app
@@ -1,10 +1,3 @@
-import pandas as pd
-import numpy as np
-try:
-    import talib as ta
-except ImportError:
-    import pandas_ta as ta
-
 class TradingStrategy:
     def __init__(self, tp_percent=2.0, sl_percent=1.0, rsi_period=14, ma_period=20):
         self.tp_percent = tp_percent
@@ -1,10 +1,36 @@
-import requests
+import logging
+import os
+import time
 import numpy as np
 from datetime import datetime, timedelta
+from data_source import get_data_source
+from metrics import record_cache, upstream, timed_stage
+from singleflight import SingleFlight
+from universe import iter_coins
+from quotes import QuoteRates
+from results import Analysis, Opportunity, Recommendation, ScanEntry, TimeframeLevels, levels, round_price
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('pivots', 'volume_profile')
 
 class SupportResistanceAnalyzer:
-    def __init__(self):
+    def __init__(self, data_source=None, price_table=None):
         self.coingecko_base = "https://api.coingecko.com/api/v3"
+        self.source = data_source or get_data_source()
+        self.inflight = SingleFlight('analyzer')
+        # A live_prices.PriceTable, read before falling back to /simple/price
+        self.prices = price_table
+        self.price_max_age = float(os.environ.get('LIVE_PRICE_MAX_AGE', 10))
+        # Level detector: 'pivots' (local extremes plus round numbers) or 'volume_profile'
+        self.engine = os.environ.get('SR_ENGINE', 'pivots')
+        # Quote currency of the analyses; anything but usd is derived from the USD data, see quotes.py
+        self.quote = os.environ.get('SR_QUOTE', 'usd').lower()
+        self.quote_rate_ttl = float(os.environ.get('QUOTE_RATE_TTL', 60))
+        self._rates = None
+        # Finished analyses per coin, timeframes, engine and quote, kept ANALYSIS_CACHE_TTL seconds (0 disables)
+        self.analysis_ttl = float(os.environ.get('ANALYSIS_CACHE_TTL', 15))
+        self._analyses = {}
         self.timeframes = {
             '15m': {'days': 1, 'interval': 'hourly'},
             '1h': {'days': 7, 'interval': 'hourly'}, 
@@ -14,6 +40,11 @@ class SupportResistanceAnalyzer:
         }
     
     def get_coin_data(self, coin_id, timeframe):
+        prices, timestamps, _ = self.get_coin_history(coin_id, timeframe)
+        return prices, timestamps
+    
+    def get_coin_history(self, coin_id, timeframe):
+        """prices, timestamps and volumes from one market_chart request"""
         try:
             tf_config = self.timeframes[timeframe]
             url = f"{self.coingecko_base}/coins/{coin_id}/market_chart"
@@ -23,17 +54,25 @@ class SupportResistanceAnalyzer:
                 'interval': tf_config['interval']
             }
             
-            response = requests.get(url, params=params)
-            data = response.json()
-            
-            prices = [p[1] for p in data['prices']]
-            timestamps = [p[0] for p in data['prices']]
+            with upstream('get_coin_data'):
+                response = self.source.get(url, params=params)
+                data = response.json()
+                
+                prices = [p[1] for p in data['prices']]
+                timestamps = [p[0] for p in data['prices']]
+                volumes = [v[1] for v in data.get('total_volumes', [])]
             
-            return prices, timestamps
+            return prices, timestamps, volumes
         except:
-            return [], []
+            return [], [], []
     
-    def find_support_resistance(self, prices, strength=2):
+    @timed_stage('find_support_resistance')
+    def find_support_resistance(self, prices, strength=2, round_levels=True):
+        """Local highs and lows plus, with round_levels, the $100 round numbers around the price.
+
+        The round numbers only mean something in USD; analyses in other
+        quote currencies pass round_levels=False.
+        """
         if len(prices) < 6:
             return [], []
         
@@ -65,7 +104,7 @@ class SupportResistanceAnalyzer:
         current_price = prices[-1]
         price_levels = []
         base = int(current_price / 100) * 100  # Round to nearest 100
-        for i in range(-5, 6):
+        for i in range(-5, 6) if round_levels else ():
             level = base + (i * 100)
             if level > 0:
                 price_levels.append(level)
@@ -75,53 +114,168 @@ class SupportResistanceAnalyzer:
         all_resistances = resistances + [p for p in price_levels if p > current_price]
         
         # Remove duplicates and sort
-        supports = sorted(list(set([round(s, 2) for s in all_supports if s > 0])))
-        resistances = sorted(list(set([round(r, 2) for r in all_resistances if r > 0])), reverse=True)
+        supports = sorted(list(set([round_price(s, 2) for s in all_supports if s > 0])))
+        resistances = sorted(list(set([round_price(r, 2) for r in all_resistances if r > 0])), reverse=True)
         
         return supports[-8:], resistances[:8]  # Return more levels
     
-    def analyze_coin(self, coin_id, coin_name, symbol, selected_timeframes=None):
+    @timed_stage('find_volume_profile_levels')
+    def find_volume_profile_levels(self, prices, volumes=None, bin_pct=None, max_levels=8):
+        """Levels at the densest price zones of a volume-at-price histogram.
+        
+        Bins are bin_pct percent wide (SR_BIN_PCT, default 0.5), i.e. equal
+        width in log price, so the histogram works the same for BTC and SHIB.
+        Each price is weighted by its volume when volumes line up with prices,
+        otherwise by the time spent there. Local peaks above the mean density
+        become levels, strongest first; one np.histogram pass, O(n).
+        """
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) < 6:
+            return [], []
+        weights = None
+        if volumes is not None and len(volumes) == len(prices):
+            weights = np.asarray(volumes, dtype=float)[prices > 0]
+        prices = prices[prices > 0]
+        if len(prices) < 6 or prices.min() == prices.max():
+            return [], []
+        
+        bin_pct = bin_pct if bin_pct is not None else float(os.environ.get('SR_BIN_PCT', 0.5))
+        log_prices = np.log(prices)
+        low, high = log_prices.min(), log_prices.max()
+        n_bins = int(np.clip(np.ceil((high - low) / np.log1p(bin_pct / 100)), 3, 1000))
+        hist, edges = np.histogram(log_prices, bins=n_bins, range=(low, high), weights=weights)
+        
+        padded = np.concatenate(([-np.inf], hist, [-np.inf]))
+        peaks = np.flatnonzero((hist > padded[:-2]) & (hist >= padded[2:]) & (hist > hist.mean()))
+        peaks = peaks[np.argsort(hist[peaks])[::-1]]
+        levels = np.exp((edges[peaks] + edges[peaks + 1]) / 2)
+        
+        current_price = prices[-1]
+        supports = [round_price(p) for p in levels if p < current_price][:max_levels]
+        resistances = [round_price(p) for p in levels if p > current_price][:max_levels]
+        return sorted(supports), sorted(resistances, reverse=True)
+    
+    def quote_rates(self):
+        """The shared QuoteRates, replaced once it is older than QUOTE_RATE_TTL seconds"""
+        rates = self._rates
+        if rates is None or rates.age() > self.quote_rate_ttl:
+            rates = self._rates = QuoteRates(self)
+        return rates
+    
+    def analyze_coin(self, coin_id, coin_name, symbol, selected_timeframes=None, engine=None, quote=None, rates=None):
+        """Analysis in one quote currency (default SR_QUOTE, usd); None if the price or rates are unavailable"""
+        quote = (quote or self.quote).lower()
+        return (self.analyze_coin_quotes(coin_id, coin_name, symbol, [quote], selected_timeframes, engine, rates) or {}).get(quote)
+    
+    def analyze_coin_quotes(self, coin_id, coin_name, symbol, quotes, selected_timeframes=None, engine=None, rates=None):
+        """quote -> Analysis for several quote currencies from a single set of USD requests.
+
+        Each quote's Analysis is cached on its own, so asking for btc after
+        usd only derives btc. A quote whose rates were unavailable maps to
+        None and isn't cached.
+        """
+        engine = engine or self.engine
+        quotes = tuple(q.lower() for q in quotes)
+        timeframes = frozenset(selected_timeframes) if selected_timeframes else None
+        analyses = {quote: self._cached_analysis((coin_id, timeframes, engine, quote)) for quote in quotes}
+        missing = tuple(quote for quote in quotes if analyses[quote] is None)
+        for quote in quotes:
+            record_cache('analysis', quote not in missing)
+        if not missing:
+            return analyses
+        
+        # Concurrent requests for the same coin, timeframes, engine and quotes share one analysis
+        key = (coin_id, timeframes, engine, frozenset(missing))
+        computed = self.inflight.do(key, self._analyze_coin, coin_id, coin_name, symbol, selected_timeframes, engine,
+                                    missing, rates)
+        if computed is None:
+            return None
+        expires = time.monotonic() + self.analysis_ttl
+        for quote, analysis in computed.items():
+            analyses[quote] = analysis
+            if analysis is not None and self.analysis_ttl > 0:
+                self._analyses[(coin_id, timeframes, engine, quote)] = (expires, analysis)
+        if len(self._analyses) > 10000:
+            now = time.monotonic()
+            self._analyses = {k: v for k, v in self._analyses.items() if v[0] > now}
+        return analyses
+    
+    def _cached_analysis(self, key):
+        entry = self._analyses.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+    
+    def _analyze_coin(self, coin_id, coin_name, symbol, selected_timeframes=None, engine=None, quotes=('usd',), rates=None):
         current_price = self.get_current_price(coin_id)
         if not current_price:
             return None
-            
-        analysis = {
-            'coin_id': coin_id,
-            'name': coin_name,
-            'symbol': symbol,
-            'current_price': current_price,
-            'timeframes': {},
-            'recommendations': []
-        }
         
         timeframes_to_analyze = selected_timeframes or self.timeframes.keys()
-        
+        series, timestamps, volumes = {}, {}, {}
         for tf in timeframes_to_analyze:
-            prices, timestamps = self.get_coin_data(coin_id, tf)
-            if prices:
-                supports, resistances = self.find_support_resistance(prices)
+            series[tf], timestamps[tf], volumes[tf] = self.get_coin_history(coin_id, tf)
+        
+        analyses = {}
+        for quote in quotes:
+            converted = (rates or self.quote_rates()).convert(quote, current_price, series, timestamps, volumes)
+            if converted is None:
+                logger.warning("No %s rates, skipping the %s analysis of %s", quote, quote, coin_id)
+                analyses[quote] = None
+                continue
+            price, quote_series, quote_volumes = converted
+            analyses[quote] = self.build_analysis(coin_id, coin_name, symbol, price, quote_series, quote_volumes,
+                                                  engine, quote)
+        return analyses
+    
+    def find_levels(self, prices, volumes=None, engine=None, quote=None):
+        engine = engine or self.engine
+        if engine == 'volume_profile':
+            return self.find_volume_profile_levels(prices, volumes)
+        if engine != 'pivots':
+            raise ValueError(f"Unknown S/R engine: {engine}. Use one of {', '.join(ENGINES)}")
+        return self.find_support_resistance(prices, round_levels=(quote or 'usd') == 'usd')
+    
+    def build_analysis(self, coin_id, coin_name, symbol, current_price, series, volumes=None, engine=None, quote=None):
+        """The Analysis (see results.py) for already fetched price series, keyed by timeframe"""
+        engine = engine or self.engine
+        analysis = Analysis(
+            coin_id=coin_id,
+            name=coin_name,
+            symbol=symbol,
+            current_price=current_price,
+            engine=engine,
+            quote=quote or 'usd',
+            timeframes={},
+            recommendations=[]
+        )
+        
+        for tf, prices in series.items():
+            if len(prices):
+                supports, resistances = self.find_levels(prices, (volumes or {}).get(tf), engine, quote)
                 
                 # Find nearest support and resistance
-                nearest_support = max([s for s in supports if s < current_price], default=None)
-                nearest_resistance = min([r for r in resistances if r > current_price], default=None)
+                nearest_support = max((s for s in supports if s < current_price), default=None)
+                nearest_resistance = min((r for r in resistances if r > current_price), default=None)
                 
                 # Calculate distances
                 support_distance = ((current_price - nearest_support) / current_price * 100) if nearest_support else None
                 resistance_distance = ((nearest_resistance - current_price) / current_price * 100) if nearest_resistance else None
                 
-                analysis['timeframes'][tf] = {
-                    'supports': supports,
-                    'resistances': resistances,
-                    'nearest_support': nearest_support,
-                    'nearest_resistance': nearest_resistance,
-                    'support_distance_pct': round(support_distance, 2) if support_distance else None,
-                    'resistance_distance_pct': round(resistance_distance, 2) if resistance_distance else None
-                }
+                analysis.timeframes[tf] = TimeframeLevels(
+                    supports=levels(supports),
+                    resistances=levels(resistances),
+                    nearest_support=nearest_support,
+                    nearest_resistance=nearest_resistance,
+                    support_distance_pct=round(support_distance, 2) if support_distance else None,
+                    resistance_distance_pct=round(resistance_distance, 2) if resistance_distance else None
+                )
         
         # Generate recommendations
-        analysis['recommendations'] = self.generate_recommendations(analysis)
+        analysis.recommendations = self.generate_recommendations(analysis)
         return analysis
     
+    @timed_stage('generate_recommendations')
     def generate_recommendations(self, analysis):
         recommendations = []
         current_price = analysis['current_price']
@@ -133,16 +287,16 @@ class SupportResistanceAnalyzer:
                 stop_loss = data['nearest_support'] * 0.99    # 1% below support
                 take_profit = current_price * 1.05            # 5% profit target
                 
-                recommendations.append({
-                    'type': 'BUY',
-                    'timeframe': tf,
-                    'reason': f'Price near support level at ${data["nearest_support"]}',
-                    'entry_price': round(entry_price, 4),
-                    'stop_loss': round(stop_loss, 4),
-                    'take_profit': round(take_profit, 4),
-                    'risk_reward': round((take_profit - entry_price) / (entry_price - stop_loss), 2),
-                    'confidence': 'HIGH' if data['support_distance_pct'] <= 1.5 else 'MEDIUM'
-                })
+                recommendations.append(Recommendation(
+                    type='BUY',
+                    timeframe=tf,
+                    reason=f'Price near support level at ${data["nearest_support"]}',
+                    entry_price=round_price(entry_price, 4),
+                    stop_loss=round_price(stop_loss, 4),
+                    take_profit=round_price(take_profit, 4),
+                    risk_reward=round((take_profit - entry_price) / (entry_price - stop_loss), 2),
+                    confidence='HIGH' if data['support_distance_pct'] <= 1.5 else 'MEDIUM'
+                ))
             
             # Sell recommendation near resistance
             if data['resistance_distance_pct'] and data['resistance_distance_pct'] <= 2:
@@ -150,30 +304,39 @@ class SupportResistanceAnalyzer:
                 stop_loss = data['nearest_resistance'] * 1.01     # 1% above resistance
                 take_profit = current_price * 0.95               # 5% profit target
                 
-                recommendations.append({
-                    'type': 'SELL',
-                    'timeframe': tf,
-                    'reason': f'Price near resistance level at ${data["nearest_resistance"]}',
-                    'entry_price': round(entry_price, 4),
-                    'stop_loss': round(stop_loss, 4),
-                    'take_profit': round(take_profit, 4),
-                    'risk_reward': round((entry_price - take_profit) / (stop_loss - entry_price), 2),
-                    'confidence': 'HIGH' if data['resistance_distance_pct'] <= 1 else 'MEDIUM'
-                })
+                recommendations.append(Recommendation(
+                    type='SELL',
+                    timeframe=tf,
+                    reason=f'Price near resistance level at ${data["nearest_resistance"]}',
+                    entry_price=round_price(entry_price, 4),
+                    stop_loss=round_price(stop_loss, 4),
+                    take_profit=round_price(take_profit, 4),
+                    risk_reward=round((entry_price - take_profit) / (stop_loss - entry_price), 2),
+                    confidence='HIGH' if data['resistance_distance_pct'] <= 1 else 'MEDIUM'
+                ))
         
         return recommendations
     
     def get_current_price(self, coin_id):
+        if self.prices is not None:
+            price = self.prices.get(coin_id, self.price_max_age)
+            record_cache('live_prices', price is not None)
+            if price is not None:
+                return price
         try:
             url = f"{self.coingecko_base}/simple/price"
             params = {'ids': coin_id, 'vs_currencies': 'usd'}
-            response = requests.get(url, params=params)
-            data = response.json()
-            return data[coin_id]['usd']
+            with upstream('get_current_price'):
+                response = self.source.get(url, params=params)
+                data = response.json()
+                return data[coin_id]['usd']
         except:
             return None
     
     def get_top_coins(self, limit=50):
+        return self.inflight.do(('top_coins', limit), self._get_top_coins, limit)
+    
+    def _get_top_coins(self, limit=50):
         try:
             url = f"{self.coingecko_base}/coins/markets"
             params = {
@@ -182,57 +345,78 @@ class SupportResistanceAnalyzer:
                 'per_page': limit,
                 'page': 1
             }
-            response = requests.get(url, params=params)
-            return response.json()
+            with upstream('get_top_coins'):
+                response = self.source.get(url, params=params)
+                return response.json()
         except:
             return []
     
-    def scan_all_coins(self, max_support_distance=10, max_resistance_distance=8, selected_timeframes=None, stop_scan=False):
-        coins = self.get_top_coins(20)  # Reduce to top 20 for faster scanning
+    @staticmethod
+    def find_opportunities(analysis, max_support_distance, max_resistance_distance):
+        coin_opportunities = []
+        
+        for tf, data in analysis['timeframes'].items():
+            # Near support (potential buy) - increased distance
+            if (data['support_distance_pct'] and 
+                data['support_distance_pct'] <= max_support_distance):
+                coin_opportunities.append(Opportunity(
+                    type='SUPPORT',
+                    timeframe=tf,
+                    level=data['nearest_support'],
+                    distance_pct=data['support_distance_pct'],
+                    signal='BUY'
+                ))
+            
+            # Near resistance (potential sell) - increased distance
+            if (data['resistance_distance_pct'] and 
+                data['resistance_distance_pct'] <= max_resistance_distance):
+                coin_opportunities.append(Opportunity(
+                    type='RESISTANCE', 
+                    timeframe=tf,
+                    level=data['nearest_resistance'],
+                    distance_pct=data['resistance_distance_pct'],
+                    signal='SELL'
+                ))
+        
+        return coin_opportunities
+    
+    def scan_all_coins(self, max_support_distance=10, max_resistance_distance=8, selected_timeframes=None, stop_scan=False, coins=None, workers=None, quote=None):
+        quote = (quote or self.quote).lower()
+        # Quote rates are fetched once per scan and shared by every coin
+        rates = QuoteRates(self)
+        if coins is None:
+            # SCAN_UNIVERSE_SIZE pages through as many coins as asked for, e.g. 2000
+            size = int(os.environ.get('SCAN_UNIVERSE_SIZE', 0))
+            coins = iter_coins(self.source, limit=size) if size else self.get_top_coins(20)
+        
+        # SCAN_WORKERS > 1 analyses the universe in a process pool, see parallel_scan
+        workers = workers if workers is not None else int(os.environ.get('SCAN_WORKERS', 1))
+        if workers > 1 and not stop_scan:
+            from parallel_scan import scan_sharded
+            return scan_sharded(self, coins, max_support_distance, max_resistance_distance, selected_timeframes, workers,
+                                quote, rates)
+        
         opportunities = []
         
-        print(f"Scanning {len(coins)} coins...")
+        # coins may be a lazy iter_coins stream, so it is only walked once
+        logger.info("Scanning coins")
+        scanned = 0
         
-        for i, coin in enumerate(coins):
+        for coin in coins:
             if stop_scan:
                 break
                 
-            print(f"Analyzing {coin['name']} ({i+1}/{len(coins)})...")
-            analysis = self.analyze_coin(coin['id'], coin['name'], coin['symbol'], selected_timeframes)
+            scanned += 1
+            logger.debug("Analyzing %s (#%d)", coin['name'], scanned)
+            analysis = self.analyze_coin(coin['id'], coin['name'], coin['symbol'], selected_timeframes,
+                                         quote=quote, rates=rates)
             if not analysis:
                 continue
                 
-            coin_opportunities = []
-            
-            for tf, data in analysis['timeframes'].items():
-                # Near support (potential buy) - increased distance
-                if (data['support_distance_pct'] and 
-                    data['support_distance_pct'] <= max_support_distance):
-                    coin_opportunities.append({
-                        'type': 'SUPPORT',
-                        'timeframe': tf,
-                        'level': data['nearest_support'],
-                        'distance_pct': data['support_distance_pct'],
-                        'signal': 'BUY'
-                    })
-                
-                # Near resistance (potential sell) - increased distance
-                if (data['resistance_distance_pct'] and 
-                    data['resistance_distance_pct'] <= max_resistance_distance):
-                    coin_opportunities.append({
-                        'type': 'RESISTANCE', 
-                        'timeframe': tf,
-                        'level': data['nearest_resistance'],
-                        'distance_pct': data['resistance_distance_pct'],
-                        'signal': 'SELL'
-                    })
-            
+            coin_opportunities = self.find_opportunities(analysis, max_support_distance, max_resistance_distance)
             if coin_opportunities:
-                opportunities.append({
-                    'coin': analysis,
-                    'opportunities': coin_opportunities
-                })
-                print(f"Found {len(coin_opportunities)} opportunities for {coin['name']}")
+                opportunities.append(ScanEntry(coin=analysis, opportunities=coin_opportunities))
+                logger.debug("Found %d opportunities for %s", len(coin_opportunities), coin['name'])
         
-        print(f"Scan complete. Found {len(opportunities)} coins with opportunities.")
+        logger.info("Scan complete. Scanned %d coins, found %d with opportunities", scanned, len(opportunities))
         return opportunities
\ No newline at end of file
@@ -1,28 +1,51 @@
-import requests
+import logging
+import os
 import random
 from datetime import datetime, timedelta
+from data_source import get_data_source
+from metrics import record_cache, upstream
+from singleflight import SingleFlight
+from universe import iter_coins
+
+logger = logging.getLogger(__name__)
 
 class SupportResistanceAnalyzer:
-    def __init__(self):
+    def __init__(self, data_source=None, price_table=None):
         self.coingecko_base = "https://api.coingecko.com/api/v3"
+        self.source = data_source or get_data_source()
+        self.inflight = SingleFlight('analyzer')
+        # A live_prices.PriceTable, read before falling back to /simple/price
+        self.prices = price_table
+        self.price_max_age = float(os.environ.get('LIVE_PRICE_MAX_AGE', 10))
     
     def get_current_price(self, coin_id):
+        if self.prices is not None:
+            price = self.prices.get(coin_id, self.price_max_age)
+            record_cache('live_prices', price is not None)
+            if price is not None:
+                return price
         try:
             url = f"{self.coingecko_base}/simple/price"
             params = {'ids': coin_id, 'vs_currencies': 'usd'}
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if coin_id in data and 'usd' in data[coin_id]:
-                    return data[coin_id]['usd']
+            with upstream('get_current_price') as check:
+                response = self.source.get(url, params=params)
+                if check(response):
+                    data = response.json()
+                    if coin_id in data and 'usd' in data[coin_id]:
+                        return data[coin_id]['usd']
         except Exception as e:
-            print(f"API Error for {coin_id}: {e}")
+            logger.warning("API error for %s: %s", coin_id, e)
         
         return None  # Let analyze_coin handle fallback
     
     def analyze_coin(self, coin_id, coin_name, symbol, selected_timeframes=None):
+        # Concurrent requests for the same coin and timeframes share one analysis
+        key = (coin_id, frozenset(selected_timeframes) if selected_timeframes else None)
+        return self.inflight.do(key, self._analyze_coin, coin_id, coin_name, symbol, selected_timeframes)
+    
+    def _analyze_coin(self, coin_id, coin_name, symbol, selected_timeframes=None):
         # Always get fresh real-time price
-        print(f"Getting real-time price for {coin_id}...")
+        logger.debug("Getting real-time price for %s", coin_id)
         current_price = self.get_current_price(coin_id)
         
         # If API fails, get from coin list
@@ -34,7 +57,7 @@ class SupportResistanceAnalyzer:
             else:
                 current_price = 50000
         
-        print(f"Current price for {coin_id}: ${current_price}")
+        logger.debug("Current price for %s: $%s", coin_id, current_price)
         
         # Generate mock support/resistance levels based on current price
         supports = []
@@ -104,6 +127,9 @@ class SupportResistanceAnalyzer:
         return analysis
     
     def get_top_coins(self, limit=50):
+        return self.inflight.do(('top_coins', limit), self._get_top_coins, limit)
+    
+    def _get_top_coins(self, limit=50):
         try:
             url = f"{self.coingecko_base}/coins/markets"
             params = {
@@ -112,11 +138,12 @@ class SupportResistanceAnalyzer:
                 'per_page': min(limit, 50),
                 'page': 1
             }
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            with upstream('get_top_coins') as check:
+                response = self.source.get(url, params=params)
+                if check(response):
+                    return response.json()
         except Exception as e:
-            print(f"API Error getting coins: {e}")
+            logger.warning("API error getting coins: %s", e)
         
         # Fallback mock data if API fails
         return [
@@ -162,17 +189,23 @@ class SupportResistanceAnalyzer:
             {'id': 'synthetix-network-token', 'name': 'Synthetix', 'symbol': 'snx', 'current_price': 2.4, 'price_change_percentage_24h': 1.6}
         ][:limit]
     
-    def scan_all_coins(self, max_support_distance=10, max_resistance_distance=8, selected_timeframes=None, stop_scan=False):
-        coins = self.get_top_coins(15)  # Scan 15 coins
+    def scan_all_coins(self, max_support_distance=10, max_resistance_distance=8, selected_timeframes=None, stop_scan=False, coins=None):
+        if coins is None:
+            # SCAN_UNIVERSE_SIZE pages through as many coins as asked for, e.g. 2000
+            size = int(os.environ.get('SCAN_UNIVERSE_SIZE', 0))
+            coins = iter_coins(self.source, limit=size) if size else self.get_top_coins(15)
         opportunities = []
         
-        print(f"Scanning {len(coins)} coins...")
+        # coins may be a lazy iter_coins stream, so it is only walked once
+        logger.info("Scanning coins")
+        scanned = 0
         
-        for i, coin in enumerate(coins):
+        for coin in coins:
             if stop_scan:
                 break
                 
-            print(f"Analyzing {coin['name']} ({i+1}/{len(coins)})...")
+            scanned += 1
+            logger.debug("Analyzing %s (#%d)", coin['name'], scanned)
             analysis = self.analyze_coin(coin['id'], coin['name'], coin['symbol'], selected_timeframes)
             
             coin_opportunities = []
@@ -203,7 +236,7 @@ class SupportResistanceAnalyzer:
                     'coin': analysis,
                     'opportunities': coin_opportunities
                 })
-                print(f"Found {len(coin_opportunities)} opportunities for {coin['name']}")
+                logger.debug("Found %d opportunities for %s", len(coin_opportunities), coin['name'])
         
-        print(f"Scan complete. Found {len(opportunities)} coins with opportunities.")
+        logger.info("Scan complete. Scanned %d coins, found %d with opportunities", scanned, len(opportunities))
         return opportunities
\ No newline at end of file
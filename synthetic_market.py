@@ -0,0 +1,146 @@
+import re
+import numpy as np
+
+class SyntheticResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+class SyntheticMarket:
+    """Seeded universe of fake coins with realistic hourly price paths.
+
+    It answers the CoinGecko endpoints the analyzers use (/coins/markets,
+    /simple/price, /coins/<id>/market_chart and /exchange_rates), so it can
+    be passed anywhere a data source is accepted:
+
+        market = SyntheticMarket(n_coins=5000, days=3 * 365)
+        analyzer = SupportResistanceAnalyzer(market)
+
+    Paths are regenerated from (seed, coin index) on every request instead of
+    being stored, so memory stays flat however large the universe is. The
+    top coin also answers to 'bitcoin', so BTC-quoted analysis works offline.
+    """
+    # USD per unit of the fiat currencies /exchange_rates lists
+    FIAT_RATES = {'usd': 1.0, 'eur': 1.08, 'gbp': 1.27, 'jpy': 0.0067}
+    REGIMES = ('trending', 'ranging', 'volatile', 'microcap')
+
+    def __init__(self, n_coins=1000, days=365, seed=42):
+        self.n_coins = n_coins
+        self.days = days
+        self.seed = seed
+        self.hours = days * 24
+        self.end_ms = 1700000000000
+
+        rng = np.random.default_rng(seed)
+        # Market caps fall off roughly like a power law with rank
+        self.market_caps = 1e12 / np.arange(1, n_coins + 1) ** 1.3
+        self.regimes = [self.REGIMES[i] for i in rng.integers(0, 3, n_coins)]
+        # Micro-caps only appear outside the top 100, like in the real market
+        for i in range(100, n_coins):
+            if rng.random() < 0.2:
+                self.regimes[i] = 'microcap'
+        self.start_prices = np.where(
+            [r == 'microcap' for r in self.regimes],
+            10 ** rng.uniform(-6, -3, n_coins),   # SHIB-style 0.000015 prices
+            10 ** rng.uniform(-2, 5, n_coins)
+        )
+        self._index = {self.coin_id(i): i for i in range(n_coins)}
+        self._index['bitcoin'] = 0
+        self._last_prices = {}
+
+    def coin_id(self, i):
+        return f"synth-{self.regimes[i]}-{i}"
+
+    def series(self, i):
+        """Full hourly history of coin i, oldest first"""
+        rng = np.random.default_rng([self.seed, i])
+        regime = self.regimes[i]
+        n = self.hours
+
+        if regime == 'trending':
+            drift = rng.choice([-1, 1]) * rng.uniform(0.00002, 0.0001)
+            log_path = np.cumsum(rng.normal(drift, 0.006, n))
+        elif regime == 'ranging':
+            # Overlapping cycles plus a little noise, staying within a band around the start price
+            t = np.arange(n)
+            log_path = (0.08 * np.sin(2 * np.pi * t / rng.uniform(200, 800) + rng.uniform(0, 6.3)) +
+                        0.04 * np.sin(2 * np.pi * t / rng.uniform(30, 120) + rng.uniform(0, 6.3)) +
+                        rng.normal(0, 0.004, n))
+        else:
+            vol = 0.02 if regime == 'volatile' else 0.03
+            jumps = rng.normal(0, 0.08, n) * (rng.random(n) < 0.002)
+            log_path = np.cumsum(rng.normal(0, vol, n) + jumps)
+
+        return self.start_prices[i] * np.exp(log_path)
+
+    def last_prices(self, i):
+        # Only the last day is kept per coin, for the market listing and spot price
+        if i not in self._last_prices:
+            self._last_prices[i] = self.series(i)[-25:]
+        return self._last_prices[i]
+
+    def coins(self, limit=None, page=1):
+        start = (page - 1) * (limit or self.n_coins)
+        end = min(self.n_coins, start + (limit or self.n_coins))
+        result = []
+        for i in range(start, end):
+            prices = self.last_prices(i)
+            result.append({
+                'id': self.coin_id(i),
+                'name': f"Synthetic {i}",
+                'symbol': f"s{i}",
+                'current_price': float(prices[-1]),
+                'market_cap': float(self.market_caps[i]),
+                'total_volume': float(self.market_caps[i] * 0.05),
+                'price_change_percentage_24h': float((prices[-1] / prices[-25] - 1) * 100) if len(prices) > 24 else 0.0
+            })
+        return result
+
+    def market_chart(self, i, days, interval=None):
+        prices = self.series(i)[-int(days) * 24:]
+        step = 24 if interval == 'daily' else 1
+        prices = prices[::-1][::step][::-1]
+        timestamps = self.end_ms - np.arange(len(prices))[::-1] * 3600000 * step
+        # Volume spikes on big moves
+        moves = np.abs(np.diff(np.log(prices), prepend=np.log(prices[0])))
+        volumes = self.market_caps[i] * 0.05 / 24 * step * (1 + 50 * moves)
+        return {
+            'prices': [[int(t), float(p)] for t, p in zip(timestamps, prices)],
+            'total_volumes': [[int(t), float(v)] for t, v in zip(timestamps, volumes)]
+        }
+
+    # --- data source interface ---------------------------------------------
+
+    def get(self, url, params=None, timeout=10):
+        params = params or {}
+        if url.endswith('/coins/markets'):
+            return SyntheticResponse(self.coins(int(params.get('per_page', 100)), int(params.get('page', 1))))
+
+        if url.endswith('/simple/price'):
+            result = {}
+            for coin_id in str(params.get('ids', '')).split(','):
+                if coin_id in self._index:
+                    result[coin_id] = {'usd': float(self.last_prices(self._index[coin_id])[-1])}
+            return SyntheticResponse(result)
+
+        if url.endswith('/exchange_rates'):
+            # CoinGecko quotes every rate as units per BTC
+            btc_usd = float(self.last_prices(0)[-1])
+            rates = {'btc': {'name': 'Bitcoin', 'unit': 'BTC', 'value': 1.0, 'type': 'crypto'}}
+            for code, usd in self.FIAT_RATES.items():
+                rates[code] = {'name': code.upper(), 'unit': code.upper(), 'value': btc_usd / usd, 'type': 'fiat'}
+            return SyntheticResponse({'rates': rates})
+
+        match = re.search(r'/coins/([^/]+)/market_chart$', url)
+        if match and match.group(1) in self._index:
+            i = self._index[match.group(1)]
+            return SyntheticResponse(self.market_chart(i, params.get('days', 1), params.get('interval')))
+
+        return SyntheticResponse({'error': 'not found'}, 404)
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+from alerts import ALERTS, AlertDispatcher, TelegramError
+from rate_limiter import RateLimiter
+
+class NoLimit:
+    def __init__(self):
+        self.throttled = []
+
+    def acquire(self):
+        pass
+
+    def throttle(self, delay):
+        self.throttled.append(delay)
+
+    def recover(self):
+        pass
+
+def signal(symbol, side='long', price=100.0):
+    return {'symbol': symbol, 'side': side, 'price': price, 'timestamp': datetime(2024, 1, 1, 12, 0, 0)}
+
+def test_submit_does_not_wait_for_delivery():
+    release = threading.Event()
+    sent = []
+
+    def slow_send(text):
+        release.wait(5)
+        sent.append(text)
+
+    dispatcher = AlertDispatcher(slow_send, workers=1, coalesce_window=0, limiter=NoLimit())
+    assert dispatcher.submit(signal('BTCUSDT'))
+    assert dispatcher.submit(signal('ETHUSDT'))  # returns while the first send is stuck
+    release.set()
+    dispatcher.join()
+    assert len(sent) >= 1
+
+def test_duplicates_dropped_and_bursts_coalesced():
+    sent = []
+    dispatcher = AlertDispatcher(sent.append, workers=1, coalesce_window=0.2, limiter=NoLimit())
+    duplicates = ALERTS.get(outcome='duplicate')
+
+    assert dispatcher.submit(signal('BTCUSDT'))
+    assert not dispatcher.submit(signal('BTCUSDT', price=101.0))
+    assert dispatcher.submit(signal('BTCUSDT', side='short'))
+    assert dispatcher.submit(signal('ETHUSDT'))
+    dispatcher.join()
+
+    assert ALERTS.get(outcome='duplicate') == duplicates + 1
+    assert len(sent) == 1
+    assert sent[0].startswith('🚨 3 Signal Alerts')
+
+def test_full_queue_drops():
+    block = threading.Event()
+    dispatcher = AlertDispatcher(lambda text: block.wait(5), workers=1, max_queue=1,
+                                 coalesce_window=0, limiter=NoLimit())
+    results = [dispatcher.submit(signal(f'C{i}USDT')) for i in range(5)]
+    block.set()
+    assert results[0] and not all(results)
+
+def test_dropped_alert_is_not_a_duplicate():
+    # No workers, so nothing drains the queue until the test does
+    dispatcher = AlertDispatcher(lambda text: None, workers=0, max_queue=1, coalesce_window=0, limiter=NoLimit())
+    assert dispatcher.submit(signal('BTCUSDT'))
+    assert not dispatcher.submit(signal('ETHUSDT'))  # queue full
+    dispatcher._queue.get_nowait()
+    assert dispatcher.submit(signal('ETHUSDT'))
+
+def test_retries_honour_retry_after():
+    limiter = NoLimit()
+    attempts = []
+
+    def flaky(text):
+        attempts.append(text)
+        if len(attempts) == 1:
+            raise TelegramError("rate limited", retry_after=7)
+        if len(attempts) == 2:
+            raise TelegramError("HTTP 502")
+
+    dispatcher = AlertDispatcher(flaky, workers=1, coalesce_window=0, limiter=limiter)
+    dispatcher.sleep = lambda seconds: None
+    dispatcher.submit(signal('BTCUSDT'))
+    dispatcher.join()
+    assert len(attempts) == 3
+    assert limiter.throttled == [7]
+
+def test_successful_sends_restore_the_shared_rate():
+    limiter = RateLimiter('telegram', rate=1.0, capacity=3,
+                          db_path=os.path.join(tempfile.mkdtemp(), 'limits.db'))
+    now = [1000.0]
+    limiter.clock = lambda: now[0]
+    def sleep(seconds):
+        # A little extra so float rounding can't leave the bucket a hair short of a token
+        now[0] += seconds + 1e-6
+    limiter.sleep = sleep
+
+    attempts = []
+    def send(text):
+        attempts.append(text)
+        if len(attempts) == 1:
+            raise TelegramError("rate limited", retry_after=1)
+
+    dispatcher = AlertDispatcher(send, workers=1, coalesce_window=0, limiter=limiter)
+    dispatcher.submit(signal('BTCUSDT'))
+    dispatcher.join()
+    throttled = limiter.current_rate()
+    assert throttled < 1.0
+
+    for i in range(20):
+        dispatcher.submit(signal(f'C{i}USDT'))
+        dispatcher.join()
+    assert limiter.current_rate() > throttled
+    assert abs(limiter.current_rate() - 1.0) < 1e-9
@@ -1,6 +1,6 @@
-import requests
+from data_source import get_data_source
 
-# Test CoinGecko API directly
+# Test CoinGecko API directly (set SR_DATA_MODE=replay to run offline)
 def test_coingecko():
     print("Testing CoinGecko API directly...")
     
@@ -11,7 +11,7 @@ def test_coingecko():
         print(f"URL: {url}")
         print(f"Params: {params}")
         
-        response = requests.get(url, params=params, timeout=10)
+        response = get_data_source().get(url, params=params, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -0,0 +1,48 @@
+import json
+import math
+import tempfile
+from data_source import RecordedResponse, RecordingDataSource, ReplayDataSource, ReplayMiss
+from support_resistance import SupportResistanceAnalyzer
+
+class FakeCoinGecko:
+    """Serves a fixed price series, standing in for the live API"""
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=10):
+        self.calls += 1
+        if url.endswith('/simple/price'):
+            return RecordedResponse(200, json.dumps({'bitcoin': {'usd': 101.0}}))
+        if url.endswith('/market_chart'):
+            prices = [[i * 3600000, 100 + 5 * math.sin(i / 3)] for i in range(168)]
+            return RecordedResponse(200, json.dumps({'prices': prices}))
+        return RecordedResponse(404, '{}')
+
+# A recorded scan replays to the identical analysis without the upstream source
+def test_record_then_replay():
+    path = tempfile.mkdtemp()
+    live = FakeCoinGecko()
+
+    recorded = SupportResistanceAnalyzer(RecordingDataSource(path, live)).analyze_coin('bitcoin', 'Bitcoin', 'btc', ['1h', '4h'])
+    replayed = SupportResistanceAnalyzer(ReplayDataSource(path)).analyze_coin('bitcoin', 'Bitcoin', 'btc', ['1h', '4h'])
+
+    assert live.calls == 3
+    assert recorded == replayed
+    assert replayed['timeframes']['1h']['supports']
+    print(f"Replayed {len(replayed['timeframes'])} timeframes from {path}")
+
+# Requests missing from the recording behave like a network failure
+def test_replay_miss():
+    source = ReplayDataSource(tempfile.mkdtemp())
+    try:
+        source.get('https://api.coingecko.com/api/v3/simple/price', {'ids': 'bitcoin'})
+        assert False, "expected ReplayMiss"
+    except ReplayMiss:
+        pass
+
+    analyzer = SupportResistanceAnalyzer(source)
+    assert analyzer.get_current_price('bitcoin') is None
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_replay_miss()
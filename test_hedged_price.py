@@ -0,0 +1,57 @@
+import time
+from api.index import SupportResistanceAnalyzer
+
+def make_provider(delay, price):
+    def provider(coin_id):
+        time.sleep(delay)
+        if price is None:
+            raise ValueError("provider down")
+        return price
+    return provider
+
+def make_analyzer(providers, hedge_delay=0.05):
+    analyzer = SupportResistanceAnalyzer()
+    analyzer.hedge_delay = hedge_delay
+    analyzer.price_providers = lambda: providers
+    return analyzer
+
+# A slow first provider no longer holds up the lookup
+def test_hedged_beats_slow_provider():
+    analyzer = make_analyzer([
+        ('Slow', make_provider(2.0, 100.0)),
+        ('Fast', make_provider(0.01, 101.0)),
+    ])
+    start = time.time()
+    result = analyzer.fetch_price('bitcoin')
+    elapsed = time.time() - start
+
+    assert result['price'] == 101.0
+    assert result['provider'] == 'Fast'
+    assert result['providers']['Slow']['status'] == 'cancelled'
+    assert result['providers']['Fast']['latency_ms'] is not None
+    assert elapsed < 1.0
+    print(f"Hedged fetch took {elapsed * 1000:.0f} ms: {result['providers']}")
+
+# A fast failure starts the next provider without waiting for the hedge delay
+def test_failure_launches_next():
+    analyzer = make_analyzer([
+        ('Broken', make_provider(0.0, None)),
+        ('Good', make_provider(0.0, 50.0)),
+        ('Unused', make_provider(0.0, 60.0)),
+    ], hedge_delay=5.0)
+    result = analyzer.fetch_price('bitcoin')
+
+    assert result['provider'] == 'Good'
+    assert result['providers']['Broken']['status'] == 'failed'
+    assert result['providers']['Unused']['status'] == 'skipped'
+
+def test_all_failed():
+    analyzer = make_analyzer([('A', make_provider(0.0, None)), ('B', make_provider(0.0, 0))])
+    result = analyzer.fetch_price('bitcoin')
+    assert result['price'] is None
+    assert {p['status'] for p in result['providers'].values()} == {'failed'}
+
+if __name__ == "__main__":
+    test_hedged_beats_slow_provider()
+    test_failure_launches_next()
+    test_all_failed()
@@ -0,0 +1,94 @@
+import json
+import queue
+import time
+
+from live_prices import BinanceFeed, KrakenFeed, LivePriceService, PriceTable
+from support_resistance import SupportResistanceAnalyzer
+from synthetic_market import SyntheticMarket
+
+class StandInServer:
+    """Hands out in-memory connections; push() sends a message to whoever is connected"""
+
+    def __init__(self):
+        self.connections = []
+        self.sent = []
+
+    def connect(self, url):
+        connection = StandInConnection(self)
+        self.connections.append(connection)
+        return connection
+
+    def push(self, message):
+        self.connections[-1].inbox.put(message)
+
+class StandInConnection:
+    def __init__(self, server):
+        self.server = server
+        self.inbox = queue.Queue()
+
+    def send(self, text):
+        self.server.sent.append(text)
+
+    def recv(self):
+        message = self.inbox.get()
+        if message is None:
+            raise ConnectionError("closed")
+        return message
+
+    def close(self):
+        self.inbox.put(None)
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.005)
+
+COINS = [{'id': 'bitcoin', 'symbol': 'btc'}, {'id': 'ethereum', 'symbol': 'eth'}]
+
+def test_ticks_land_in_table_and_reconnect():
+    server, table = StandInServer(), PriceTable()
+    service = LivePriceService(table, [BinanceFeed.for_coins(COINS)], connect=server.connect,
+                               min_backoff=0.01, max_backoff=0.01)
+    service.start()
+    try:
+        wait_for(lambda: server.connections)
+        server.push(json.dumps([{'s': 'BTCUSDT', 'c': '65000.5'}, {'s': 'DOGEUSDT', 'c': '0.1'}]))
+        wait_for(lambda: table.get('bitcoin') == 65000.5)
+        assert len(table) == 1
+
+        server.connections[-1].close()  # the exchange drops us
+        wait_for(lambda: len(server.connections) == 2)
+        server.push(json.dumps([{'s': 'ETHUSDT', 'c': '3100'}]))
+        wait_for(lambda: table.get('ethereum') == 3100.0)
+        assert service.status()['binance']['reconnects'] == 1
+    finally:
+        service.stop()
+
+def test_kraken_subscribes_and_parses():
+    feed = KrakenFeed.for_coins(COINS)
+    assert json.loads(feed.subscribe_messages()[0])['params']['symbol'] == ['BTC/USD', 'ETH/USD']
+    message = json.dumps({'channel': 'ticker', 'type': 'update', 'data': [{'symbol': 'ETH/USD', 'last': 3050.1}]})
+    assert list(feed.parse(message)) == [('ethereum', 3050.1)]
+    assert list(feed.parse(json.dumps({'channel': 'heartbeat'}))) == []
+
+def test_analyzer_reads_table_before_rest():
+    now = [1000.0]
+    table = PriceTable(clock=lambda: now[0])
+    market = SyntheticMarket(n_coins=3, days=5)
+    coin_id = market.coins(1)[0]['id']
+    analyzer = SupportResistanceAnalyzer(market, price_table=table)
+
+    table.update(coin_id, 123.45, 'binance')
+    assert analyzer.get_current_price(coin_id) == 123.45
+    now[0] += analyzer.price_max_age + 1
+    assert analyzer.get_current_price(coin_id) == market.last_prices(0)[-1]
+
+def test_disabled_without_websocket_client(monkeypatch):
+    import live_prices
+    monkeypatch.setattr(live_prices.importlib.util, 'find_spec', lambda name: None)
+    assert live_prices.start_live_prices([{'id': 'bitcoin', 'symbol': 'btc'}]) is None
+
+    # A connect factory doesn't need the package
+    service = live_prices.start_live_prices([{'id': 'bitcoin', 'symbol': 'btc'}], connect=StandInServer().connect)
+    service.stop()
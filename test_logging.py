@@ -0,0 +1,51 @@
+import json
+import logging
+from log_config import StructuredFormatter, parse_levels
+from support_resistance import SupportResistanceAnalyzer
+from synthetic_market import SyntheticMarket
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+    def emit(self, record):
+        self.records.append(record)
+
+def test_parse_levels():
+    assert parse_levels('support_resistance=debug, api.index=WARNING') == {
+        'support_resistance': 'DEBUG', 'api.index': 'WARNING'}
+    assert parse_levels(None) == {}
+
+def test_structured_formatter():
+    record = logging.makeLogRecord({'name': 'scan', 'levelname': 'INFO', 'msg': 'Scanned %d coins',
+                                    'args': (5,), 'coin': 'bitcoin'})
+    entry = json.loads(StructuredFormatter().format(record))
+    assert entry['message'] == 'Scanned 5 coins'
+    assert entry['coin'] == 'bitcoin'
+
+# At INFO a scan logs its summary lines only, never one line per coin
+def test_scan_quiet_at_info():
+    logger = logging.getLogger('support_resistance')
+    handler = ListHandler()
+    logger.addHandler(handler)
+    old_level = logger.level
+    try:
+        market = SyntheticMarket(n_coins=10, days=30)
+        analyzer = SupportResistanceAnalyzer(market)
+
+        logger.setLevel(logging.INFO)
+        analyzer.scan_all_coins(50, 50, ['1h'], coins=market.coins())
+        assert len(handler.records) == 2
+
+        handler.records.clear()
+        logger.setLevel(logging.DEBUG)
+        analyzer.scan_all_coins(50, 50, ['1h'], coins=market.coins())
+        assert len(handler.records) > 10
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(old_level)
+
+if __name__ == "__main__":
+    test_parse_levels()
+    test_structured_formatter()
+    test_scan_quiet_at_info()
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+import pytest
+
+from metrics import Registry, STAGE_SECONDS, UPSTREAM_ERRORS, CACHE_REQUESTS, upstream
+from synthetic_market import SyntheticMarket
+from support_resistance import SupportResistanceAnalyzer
+
+def test_prometheus_text():
+    registry = Registry()
+    latency = registry.histogram('demo_seconds', 'Demo latency', buckets=(0.1, 1))
+    errors = registry.counter('demo_errors_total', 'Demo errors')
+    latency.observe(0.05, op='fetch')
+    latency.observe(0.5, op='fetch')
+    errors.inc(op='fetch')
+
+    text = registry.render()
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{op="fetch",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{op="fetch",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{op="fetch"} 2' in text
+    assert 'demo_errors_total{op="fetch"} 1' in text
+
+def test_upstream_errors_counted():
+    before = UPSTREAM_ERRORS.get(operation='demo')
+    try:
+        with upstream('demo'):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert UPSTREAM_ERRORS.get(operation='demo') == before + 1
+
+def test_upstream_non_200_counted():
+    from support_resistance_simple import SupportResistanceAnalyzer as SimpleAnalyzer
+
+    class RateLimited:
+        status_code = 429
+        def json(self):
+            return {'status': {'error_code': 429}}
+
+    class Source:
+        def get(self, url, params=None, timeout=None):
+            return RateLimited()
+
+    analyzer = SimpleAnalyzer(Source())
+    before = UPSTREAM_ERRORS.get(operation='get_current_price')
+    assert analyzer.get_current_price('bitcoin') is None
+    assert UPSTREAM_ERRORS.get(operation='get_current_price') == before + 1
+
+# analyze_coin feeds the stage histograms and the in-flight cache counter
+def test_analyzer_instrumented():
+    market = SyntheticMarket(n_coins=5, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    before = STAGE_SECONDS.count(stage='find_support_resistance')
+    misses = CACHE_REQUESTS.get(cache='analyzer', result='miss')
+
+    coin = market.coins(1)[0]
+    analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['1h', '4h'])
+    assert STAGE_SECONDS.count(stage='find_support_resistance') == before + 2
+    assert CACHE_REQUESTS.get(cache='analyzer', result='miss') == misses + 1
+
+def test_metrics_endpoint(monkeypatch):
+    import app_sr
+    monkeypatch.setattr(app_sr.analyzer, 'source', SyntheticMarket(n_coins=5, days=30))
+    monkeypatch.setattr(app_sr.response_cache, '_entries', OrderedDict())
+    client = app_sr.app.test_client()
+    assert client.get('/get-coins').status_code == 200
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert 'sr_http_request_seconds_count{endpoint="get_coins",status="200"}' in response.get_data(as_text=True)
+    assert 'sr_stage_seconds_count{stage="serialize"}' in response.get_data(as_text=True)
+
+if __name__ == "__main__":
+    test_prometheus_text()
+    test_upstream_errors_counted()
+    test_analyzer_instrumented()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_metrics_endpoint(monkeypatch)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from monte_carlo import monte_carlo, trade_returns
+
+RETURNS = np.random.default_rng(7).normal(0.003, 0.02, 80)
+
+def test_bootstrap_distributions():
+    result = monte_carlo(RETURNS, 1000.0, simulations=5000, seed=1)
+    assert result['simulations'] == 5000 and result['trades'] == 80
+    final = result['final_balance']
+    assert final['p5'] < final['p50'] < final['p95']
+    assert 0 <= result['max_drawdown_pct']['p5'] <= result['max_drawdown_pct']['p95'] <= 100
+    assert 0 <= result['probability_of_loss'] <= 100
+    assert result == monte_carlo(RETURNS, 1000.0, simulations=5000, seed=1)
+
+def test_permute_only_changes_the_order():
+    result = monte_carlo(RETURNS, 1000.0, simulations=2000, method='permute', seed=1)
+    expected = 1000.0 * np.prod(1 + RETURNS)
+    assert result['final_balance']['p5'] == pytest.approx(expected, abs=1e-4)
+    assert result['final_balance']['p95'] == pytest.approx(expected, abs=1e-4)
+    assert result['win_rate']['std'] == 0
+    assert result['max_drawdown_pct']['std'] > 0
+
+def test_trade_returns_and_edge_cases():
+    trades = [{'profit': 100.0}, {'profit': -110.0}]
+    assert trade_returns(trades, 1000.0).tolist() == pytest.approx([0.1, -0.1])
+    assert monte_carlo([], 1000.0) is None
+    # Losing more than the balance stops the path at zero instead of going negative
+    assert monte_carlo([-2.0], 1000.0, simulations=10, seed=1)['final_balance']['p50'] == 0
+    with pytest.raises(ValueError):
+        monte_carlo(RETURNS, 1000.0, method='nope')
+
+def test_backtest_route_reports_monte_carlo(monkeypatch):
+    import app_simple
+    from benchmarks import StubSource, synthetic_prices
+    from free_api import FreeDataProvider
+
+    monkeypatch.setattr(app_simple.bot, 'data_provider', FreeDataProvider(StubSource(synthetic_prices(2000))))
+    client = app_simple.app.test_client()
+    body = {'symbol': 'BTCUSDT', 'start_date': '2024-01-01', 'end_date': '2024-03-01', 'balance': 1000, 'leverage': 2}
+    result = client.post('/backtest', json=dict(body, monte_carlo={'simulations': 500, 'seed': 3})).get_json()
+    assert result['total_trades'] > 0
+    assert result['monte_carlo']['simulations'] == 500
+    assert set(result['monte_carlo']) >= {'final_balance', 'max_drawdown_pct', 'win_rate'}
+
+    assert 'monte_carlo' not in client.post('/backtest', json=dict(body, monte_carlo=False)).get_json()
+    for options in ({'method': 'nope'}, {'seed': 'abc'}, {'seed': 1.5}, {'seed': -1},
+                    {'simulations': 'many'}, {'simulations': 2.5}, {'simulations': 0}):
+        response = client.post('/backtest', json=dict(body, monte_carlo=options))
+        assert response.status_code == 400, options
+        assert 'error' in response.get_json()
@@ -0,0 +1,38 @@
+from parallel_scan import scan_sharded
+from support_resistance import SupportResistanceAnalyzer
+from synthetic_market import SyntheticMarket
+
+def test_sharded_scan_matches_sequential():
+    market = SyntheticMarket(n_coins=12, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    coins = market.coins()
+
+    sequential = analyzer.scan_all_coins(10, 8, ['1h', '4h'], coins=coins)
+    sharded = scan_sharded(analyzer, coins, 10, 8, ['1h', '4h'], workers=2)
+    assert sharded == sequential
+    assert len(sharded) > 0
+
+def test_sharded_scan_in_batches():
+    market = SyntheticMarket(n_coins=12, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    coins = market.coins()
+
+    sequential = analyzer.scan_all_coins(100, 100, ['1h'], coins=coins)
+    # A lazy stream, taken 5 coins at a time, so the last batch is short
+    batched = scan_sharded(analyzer, iter(coins), 100, 100, ['1h'], workers=2, batch_size=5)
+    assert batched == sequential
+    assert len(batched) > 5
+
+def test_scan_workers_option_uses_pool():
+    market = SyntheticMarket(n_coins=4, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    coins = market.coins()
+    assert analyzer.scan_all_coins(100, 100, ['1d'], coins=coins, workers=2) == \
+        analyzer.scan_all_coins(100, 100, ['1d'], coins=coins, workers=1)
+
+def test_sharded_scan_in_another_quote():
+    market = SyntheticMarket(n_coins=6, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    coins = market.coins()[1:]
+    assert analyzer.scan_all_coins(100, 100, ['1h'], coins=coins, workers=2, quote='btc') == \
+        analyzer.scan_all_coins(100, 100, ['1h'], coins=coins, workers=1, quote='btc')
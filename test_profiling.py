@@ -0,0 +1,52 @@
+import tempfile
+from flask import Flask, jsonify
+from profiling import init_profiling
+
+def make_app(**kwargs):
+    app = Flask(__name__)
+    init_profiling(app, profile_dir=tempfile.mkdtemp(), **kwargs)
+
+    def busy(n):
+        return sum(i * i for i in range(n))
+
+    @app.route('/work')
+    def work():
+        return jsonify({'value': busy(200000)})
+
+    return app
+
+# A profiled request keeps its normal body and points at the stored profile
+def test_profile_stored():
+    client = make_app(enabled=True).test_client()
+    response = client.get('/work', headers={'X-Profile': '1'})
+    assert response.get_json() == {'value': sum(i * i for i in range(200000))}
+
+    profile = client.get(response.headers['X-Profile-Url']).get_json()
+    assert profile['top_functions']
+    assert any('busy' in f['function'] for f in profile['top_functions'])
+    assert profile['call_tree']['children'] is not None
+    print(f"Profile {profile['id']}: {profile['total_ms']} ms")
+
+def test_profile_inline():
+    client = make_app(enabled=True).test_client()
+    body = client.get('/work?profile=inline').get_json()
+    assert 'value' in body['result']
+    assert body['profile']['top_functions']
+
+# Disabled by config, or wrong token: no profiling at all
+def test_profile_restricted():
+    client = make_app(enabled=False).test_client()
+    response = client.get('/work', headers={'X-Profile': '1'})
+    assert 'X-Profile-Id' not in response.headers
+
+    client = make_app(enabled=True, token='secret').test_client()
+    assert 'X-Profile-Id' not in client.get('/work?profile=1').headers
+    response = client.get('/work', headers={'X-Profile': 'secret'})
+    assert 'X-Profile-Id' in response.headers
+    assert client.get(response.headers['X-Profile-Url']).status_code == 404
+    assert client.get(response.headers['X-Profile-Url'] + '?profile_token=secret').status_code == 200
+
+if __name__ == "__main__":
+    test_profile_stored()
+    test_profile_inline()
+    test_profile_restricted()
@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+import pytest
+
+import app_sr
+from projection import parse_fields, project
+from synthetic_market import SyntheticMarket
+
+ANALYSIS = {
+    'coin_id': 'bitcoin', 'symbol': 'btc', 'current_price': 100.0,
+    'timeframes': {
+        '1h': {'supports': [90, 95], 'nearest_support': 95, 'support_distance_pct': 5.0},
+        '4h': {'supports': [85, 97], 'nearest_support': 97, 'support_distance_pct': 3.0}
+    },
+    'recommendations': [{'type': 'BUY', 'entry_price': 95.5, 'reason': 'near support'}]
+}
+
+@pytest.fixture
+def market(monkeypatch):
+    """A synthetic universe behind app_sr, with an empty response cache; both restored afterwards"""
+    market = SyntheticMarket(n_coins=5, days=30)
+    monkeypatch.setattr(app_sr.analyzer, 'source', market)
+    monkeypatch.setattr(app_sr.response_cache, '_entries', OrderedDict())
+    return market
+
+def test_project_dotted_paths_and_wildcards():
+    tree = parse_fields('symbol,timeframes.*.nearest_support,recommendations.type')
+    assert project(ANALYSIS, tree) == {
+        'symbol': 'btc',
+        'timeframes': {'1h': {'nearest_support': 95}, '4h': {'nearest_support': 97}},
+        'recommendations': [{'type': 'BUY'}]
+    }
+    assert project(ANALYSIS, parse_fields('')) is ANALYSIS
+
+def test_scan_fields_and_columnar(market):
+    client = app_sr.app.test_client()
+    query = '/scan-opportunities?support_dist=100&resistance_dist=100&timeframes=1h,4h'
+
+    full = client.get(query).get_json()
+    slim = client.get(query + '&fields=coin.symbol,opportunities.signal').get_json()
+    assert len(slim) == len(full) > 0
+    assert slim[0] == {'coin': {'symbol': full[0]['coin']['symbol']},
+                       'opportunities': [{'signal': o['signal']} for o in full[0]['opportunities']]}
+
+    table = client.get(query + '&format=columnar&fields=symbol,timeframe,signal,distance_pct').get_json()
+    assert table['fields'] == ['symbol', 'timeframe', 'signal', 'distance_pct']
+    assert table['count'] == sum(len(entry['opportunities']) for entry in full)
+    assert table['columns']['signal'][:2] == [o['signal'] for o in full[0]['opportunities'][:2]]
+
+    assert 'error' in client.get(query + '&format=columnar&fields=nope').get_json()
+    assert 'error' in client.get(query + '&format=xml').get_json()
+
+def test_analyze_coin_columnar(market):
+    coin_id = market.coins(1)[0]['id']
+    table = app_sr.app.test_client().get(f'/analyze-coin/{coin_id}?timeframes=1h,1d&format=columnar').get_json()
+    assert table['count'] == 2
+    assert table['columns']['timeframe'] == ['1h', '1d']
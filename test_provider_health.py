@@ -0,0 +1,118 @@
+import time
+from provider_health import CircuitBreaker, ProviderHealth
+from api.index import SupportResistanceAnalyzer
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+# closed -> open after the threshold, half-open after the cooldown, closed on success
+def test_breaker_states():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30, clock=clock)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 31
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # only one trial at a time
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+# Slow or flaky providers sink below fast reliable ones
+def test_score_ordering():
+    health = ProviderHealth()
+    providers = [('Slow', None), ('Flaky', None), ('Fast', None)]
+    for _ in range(10):
+        health.record('Slow', True, 3000)
+        health.record('Fast', True, 50)
+    for ok in [True, False, True, False]:
+        health.record('Flaky', ok, 50)
+
+    usable, skipped = health.ordered(providers)
+    assert [name for name, _ in usable] == ['Fast', 'Flaky', 'Slow']
+    assert skipped == []
+
+# An untried provider starts at a neutral prior, not ahead of a proven one
+def test_untried_provider_does_not_jump_ahead():
+    health = ProviderHealth()
+    health.record('Fast', True, 50)
+    usable, _ = health.ordered([('New', None), ('Fast', None)])
+    assert [name for name, _ in usable] == ['Fast', 'New']
+
+    # Untried providers keep their configured order
+    usable, _ = health.ordered([('B', None), ('A', None)])
+    assert [name for name, _ in usable] == ['B', 'A']
+
+# A provider that never has a price sinks, but its breaker stays closed
+def test_no_price_counts_against_score():
+    analyzer = SupportResistanceAnalyzer()
+    analyzer.price_mode = 'sequential'
+    analyzer.price_providers = lambda: [('Empty', lambda coin_id: None), ('Works', lambda coin_id: 10.0)]
+
+    for _ in range(5):
+        assert analyzer.fetch_price_live('bitcoin')['provider'] == 'Works'
+    usable, skipped = analyzer.health.ordered(analyzer.price_providers())
+    assert [name for name, _ in usable] == ['Works', 'Empty']
+    assert skipped == []
+    assert analyzer.health.status()['Empty']['state'] == 'closed'
+
+# Once a provider's breaker opens it is not called at all
+def test_dead_provider_costs_nothing():
+    calls = []
+    def dead(coin_id):
+        calls.append(coin_id)
+        time.sleep(0.05)
+        raise ConnectionError("down")
+
+    def alive(coin_id):
+        time.sleep(0.1)
+        return 10.0
+
+    # Query both at once so the dead one is tried until its breaker opens
+    analyzer = SupportResistanceAnalyzer()
+    analyzer.hedge_delay = 0
+    analyzer.price_providers = lambda: [('Dead', dead), ('Alive', alive)]
+
+    for _ in range(3):
+        assert analyzer.fetch_price('bitcoin')['price'] == 10.0
+    result = analyzer.fetch_price('bitcoin')
+
+    assert len(calls) == 3
+    assert result['providers']['Dead'] == {'status': 'circuit_open', 'latency_ms': 0}
+    assert analyzer.health.status()['Dead']['state'] == 'open'
+    print(f"Provider health: {analyzer.health.status()}")
+
+# With every breaker open the lookup reports the fallback instead of raising
+def test_all_breakers_open():
+    def dead(coin_id):
+        raise ConnectionError("down")
+
+    analyzer = SupportResistanceAnalyzer()
+    analyzer.price_providers = lambda: [('Dead', dead)]
+    for _ in range(3):
+        assert analyzer.fetch_price('bitcoin')['price'] is None
+    result = analyzer.fetch_price('bitcoin')
+
+    assert result == {'price': None, 'provider': None,
+                      'providers': {'Dead': {'status': 'circuit_open', 'latency_ms': 0}}}
+    assert 'error' in analyzer.analyze_coin('bitcoin', 'Bitcoin', 'btc')
+
+if __name__ == "__main__":
+    test_breaker_states()
+    test_score_ordering()
+    test_untried_provider_does_not_jump_ahead()
+    test_no_price_counts_against_score()
+    test_dead_provider_costs_nothing()
+    test_all_breakers_open()
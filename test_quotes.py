@@ -0,0 +1,80 @@
+import pytest
+
+from support_resistance import SupportResistanceAnalyzer
+from synthetic_market import SyntheticMarket
+
+class CountingMarket(SyntheticMarket):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=10):
+        self.calls.append(url.split('/api/v3', 1)[-1])
+        return super().get(url, params, timeout)
+
+def test_quotes_derived_from_one_usd_fetch():
+    market = CountingMarket(n_coins=5, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    coin = market.coins()[3]
+    analyses = analyzer.analyze_coin_quotes(coin['id'], coin['name'], coin['symbol'], ['usd', 'eur', 'btc'],
+                                            ['1h', '4h'], engine='volume_profile')
+
+    assert market.calls.count(f"/coins/{coin['id']}/market_chart") == 2
+    assert market.calls.count('/exchange_rates') == 1
+    assert market.calls.count('/coins/bitcoin/market_chart') == 2
+
+    usd, eur, btc = analyses['usd'], analyses['eur'], analyses['btc']
+    assert (usd['quote'], eur['quote'], btc['quote']) == ('usd', 'eur', 'btc')
+    assert eur['current_price'] == pytest.approx(usd['current_price'] / 1.08)
+    # A constant FX rate scales the whole series, so the levels and distances scale with it
+    eur_1h, usd_1h = eur['timeframes']['1h'], usd['timeframes']['1h']
+    assert list(eur_1h['supports']) == pytest.approx([s / 1.08 for s in usd_1h['supports']], rel=1e-4)
+    assert eur_1h['support_distance_pct'] == pytest.approx(usd_1h['support_distance_pct'], abs=0.02)
+
+    btc_usd = market.coins()[0]['current_price']
+    assert btc['current_price'] == pytest.approx(usd['current_price'] / btc_usd)
+    assert all(s < btc['current_price'] for s in btc['timeframes']['1h']['supports'])
+
+def test_scan_fetches_rates_once():
+    market = CountingMarket(n_coins=8, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    found = analyzer.scan_all_coins(100, 100, ['1h', '4h'], coins=market.coins()[1:], quote='btc')
+    assert found and all(entry['coin']['quote'] == 'btc' for entry in found)
+    assert market.calls.count('/coins/bitcoin/market_chart') == 2
+
+def test_unknown_quote():
+    market = SyntheticMarket(n_coins=3, days=10)
+    analyzer = SupportResistanceAnalyzer(market)
+    coin = market.coins()[1]
+    with pytest.raises(ValueError):
+        analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['1h'], quote='xyz')
+
+def test_btc_quoted_pivot_levels_at_real_btc_prices():
+    market = SyntheticMarket(n_coins=5, days=30)
+    market.start_prices[0] = 60000.0  # bitcoin, so BTC-quoted prices are tiny fractions
+    analyzer = SupportResistanceAnalyzer(market)
+    coin = market.coins()[2]
+    btc = analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['1h', '4h'], engine='pivots', quote='btc')
+
+    price = btc['current_price']
+    assert 0 < price < 0.001
+    for levels in btc['timeframes'].values():
+        # Pivots only: no $100 round numbers, and nothing rounded down to 0.0
+        assert levels['supports'] and levels['resistances']
+        assert all(price / 2 < level < price * 2 for level in list(levels['supports']) + list(levels['resistances']))
+    for rec in btc['recommendations']:
+        assert rec['entry_price'] > 0 and rec['stop_loss'] > 0 and rec['take_profit'] > 0
+        assert rec['entry_price'] != rec['stop_loss']
+
+def test_analyses_cached_per_quote():
+    market = CountingMarket(n_coins=5, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    coin = market.coins()[3]
+    usd = analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['1h'])
+    calls = len(market.calls)
+    assert analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['1h']) is usd
+    assert len(market.calls) == calls
+
+    both = analyzer.analyze_coin_quotes(coin['id'], coin['name'], coin['symbol'], ['usd', 'eur'], ['1h'])
+    assert both['usd'] is usd and both['eur']['quote'] == 'eur'
+    assert analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['1h'], quote='eur') is both['eur']
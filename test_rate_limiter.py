@@ -0,0 +1,104 @@
+import os
+import tempfile
+import rate_limiter
+from rate_limiter import RateLimiter, parse_retry_after
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+def make_limiter(**kwargs):
+    db_path = os.path.join(tempfile.mkdtemp(), 'limits.db')
+    limiter = RateLimiter('test', db_path=db_path, **kwargs)
+
+    # Fake clock so the test never really sleeps
+    now = [1000.0]
+    limiter.clock = lambda: now[0]
+    def sleep(seconds):
+        now[0] += seconds
+    limiter.sleep = sleep
+    return limiter, now
+
+# Burst capacity is spent first, then calls are paced at the refill rate
+def test_token_bucket():
+    limiter, now = make_limiter(rate=2.0, capacity=3)
+    for _ in range(3):
+        limiter.acquire()
+    assert now[0] == 1000.0
+
+    limiter.acquire()
+    assert abs(now[0] - 1000.5) < 1e-9
+    print("Token bucket OK")
+
+# Two limiters on the same file share one budget (as gunicorn workers do)
+def test_shared_budget():
+    limiter, now = make_limiter(rate=1.0, capacity=2)
+    other = RateLimiter('test', db_path=limiter.db_path, rate=1.0, capacity=2)
+    other.clock = limiter.clock
+    other.sleep = limiter.sleep
+
+    limiter.acquire()
+    other.acquire()
+    other.acquire()
+    assert abs(now[0] - 1001.0) < 1e-9
+    print("Shared budget OK")
+
+# A 429 blocks the bucket for Retry-After seconds, halves the rate and is retried
+def test_retry_after():
+    limiter, now = make_limiter(rate=1.0, capacity=5)
+    responses = [FakeResponse(429, {'Retry-After': '7'}), FakeResponse(200)]
+    original_get = rate_limiter.requests.get
+    rate_limiter.requests.get = lambda url, params=None, timeout=None: responses.pop(0)
+    try:
+        response = limiter.get('https://example.invalid')
+    finally:
+        rate_limiter.requests.get = original_get
+
+    assert response.status_code == 200
+    assert now[0] >= 1007.0
+    assert limiter.current_rate() < 1.0
+    print(f"Retry-After OK, rate now {limiter.current_rate():.2f}/s")
+
+# A connection error is retried once, briefly; an offline host fails fast
+def test_connection_error_retried_once():
+    limiter, now = make_limiter(rate=1.0, capacity=5)
+    outcomes = [rate_limiter.requests.ConnectionError('connection reset'), FakeResponse(200)]
+    def flaky(url, params=None, timeout=None):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    calls = []
+    def refuse(url, params=None, timeout=None):
+        calls.append(url)
+        raise rate_limiter.requests.ConnectionError('connection refused')
+    original_get = rate_limiter.requests.get
+    try:
+        rate_limiter.requests.get = flaky
+        assert limiter.get('https://example.invalid').status_code == 200
+        rate_limiter.requests.get = refuse
+        try:
+            limiter.get('https://example.invalid')
+            assert False, "ConnectionError expected"
+        except rate_limiter.requests.ConnectionError:
+            pass
+    finally:
+        rate_limiter.requests.get = original_get
+
+    assert len(calls) == 2
+    assert abs(now[0] - 1000.4) < 1e-9
+    print("Connection error OK")
+
+def test_parse_retry_after():
+    assert parse_retry_after('12') == 12.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('garbage') is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_shared_budget()
+    test_retry_after()
+    test_connection_error_retried_once()
+    test_parse_retry_after()
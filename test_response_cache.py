@@ -0,0 +1,90 @@
+from flask import Flask, jsonify, request
+from metrics import CACHE_REQUESTS
+import threading
+
+from response_cache import ResponseCache, cache_warmer
+
+def make_app():
+    app = Flask(__name__)
+    cache = ResponseCache(ttl=10)
+    now = [1000.0]
+    cache.clock = lambda: now[0]
+    calls = []
+
+    @app.route('/coins')
+    @cache.cached()
+    def coins():
+        calls.append(request.args.get('page'))
+        return jsonify({'coins': ['bitcoin', 'ethereum'], 'page': request.args.get('page')})
+
+    @app.route('/broken')
+    @cache.cached()
+    def broken():
+        calls.append('broken')
+        return jsonify({'error': 'upstream down'})
+
+    @app.route('/once')
+    @cache.cached()
+    def once():
+        calls.append('once')
+        response = jsonify({'price': 100.0})
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    return app.test_client(), calls, now
+
+def test_repeat_requests_served_from_cache():
+    client, calls, _ = make_app()
+    hits = CACHE_REQUESTS.get(cache='response', result='hit')
+
+    first = client.get('/coins?page=1&t=111')
+    second = client.get('/coins?t=222&page=1')
+    assert first.get_json() == second.get_json()
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert second.headers['Cache-Control'] == 'no-cache'
+    assert calls == ['1']
+    assert CACHE_REQUESTS.get(cache='response', result='hit') == hits + 1
+
+    client.get('/coins?page=2')
+    assert calls == ['1', '2']
+
+def test_if_none_match_returns_304():
+    client, _, _ = make_app()
+    etag = client.get('/coins').headers['ETag']
+
+    response = client.get('/coins', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    assert client.get('/coins', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+def test_entries_expire_and_errors_are_not_stored():
+    client, calls, now = make_app()
+    client.get('/coins')
+    now[0] += 11
+    client.get('/coins')
+    assert calls == [None, None]
+
+    client.get('/broken')
+    client.get('/broken')
+    assert calls.count('broken') == 2
+
+def test_no_store_responses_are_not_stored():
+    client, calls, _ = make_app()
+    assert client.get('/once').headers['Cache-Control'] == 'no-store'
+    client.get('/once')
+    assert calls == ['once', 'once']
+
+def test_warmer_fills_the_cache():
+    client, calls, _ = make_app()
+    warm = cache_warmer(client.application, ['/coins?page=1', '/coins?page=2'])
+    warm(threading.Event())
+    assert calls == ['1', '2']
+    client.get('/coins?page=2')
+    assert calls == ['1', '2']
+
+    cancelled = threading.Event()
+    cancelled.set()
+    warm(cancelled)
+    assert calls == ['1', '2']
@@ -0,0 +1,30 @@
+import json
+import pickle
+
+from results import Analysis, TimeframeLevels, levels
+from serialization import json_default
+from support_resistance import SupportResistanceAnalyzer
+from synthetic_market import SyntheticMarket
+
+def make_analysis():
+    tf = TimeframeLevels(supports=levels([90, 95.5]), resistances=levels([]), nearest_support=95.5,
+                         nearest_resistance=None, support_distance_pct=4.5, resistance_distance_pct=None)
+    return Analysis(coin_id='bitcoin', name='Bitcoin', symbol='btc', current_price=100.0,
+                    engine='pivots', quote='usd', timeframes={'1h': tf}, recommendations=[])
+
+def test_record_reads_like_a_dict():
+    analysis = make_analysis()
+    tf = analysis['timeframes']['1h']
+    assert tf['nearest_support'] == 95.5 and tf.get('missing') is None
+    assert tf['supports'] and not tf['resistances'] and len(tf['supports']) == 2
+    assert list(analysis) == ['coin_id', 'name', 'symbol', 'current_price', 'engine', 'quote', 'timeframes', 'recommendations']
+    assert analysis.to_dict()['timeframes']['1h']['supports'] == [90.0, 95.5]
+    assert analysis == analysis.to_dict()
+    assert pickle.loads(pickle.dumps(analysis)) == analysis
+
+def test_scan_serializes_like_dicts():
+    analyzer = SupportResistanceAnalyzer(SyntheticMarket(n_coins=10, days=30))
+    scan = analyzer.scan_all_coins(100, 100, ['1h', '4h'])
+    assert scan
+    plain = [entry.to_dict() for entry in scan]
+    assert json.loads(json.dumps(scan, default=json_default)) == json.loads(json.dumps(plain))
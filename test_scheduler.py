@@ -0,0 +1,66 @@
+import threading
+import time
+
+from flask import Flask
+
+from scheduler import Scheduler, init_scheduler
+
+def wait_for(condition, timeout=3):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.005)
+
+def test_fixed_rate_without_drift():
+    starts = []
+    scheduler = Scheduler()
+    # Each run takes most of the period; fixed-delay scheduling would stretch it to 0.08s
+    scheduler.add('job', lambda cancel: (starts.append(time.monotonic()), time.sleep(0.03)), interval=0.05)
+    scheduler.start('job')
+    wait_for(lambda: len(starts) >= 6)
+    scheduler.stop('job')
+
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert abs((starts[5] - starts[0]) / 5 - 0.05) < 0.01
+    assert min(gaps) > 0.03
+
+def test_start_is_idempotent_and_overlaps_skipped():
+    release = threading.Event()
+    runs = []
+    scheduler = Scheduler()
+    scheduler.add('slow', lambda cancel: (runs.append(1), release.wait(2)), interval=0.02, timeout=5)
+    assert scheduler.start('slow')
+    assert not scheduler.start('slow')
+
+    wait_for(lambda: scheduler.status('slow')['skipped_overlaps'] >= 2)
+    assert len(runs) == 1
+    release.set()
+    scheduler.stop('slow')
+
+def test_timeout_cancels_run():
+    cancelled = threading.Event()
+
+    def job(cancel):
+        if cancel.wait(2):
+            cancelled.set()
+
+    scheduler = Scheduler()
+    scheduler.add('stuck', job, interval=10, timeout=0.05, start=True)
+    wait_for(cancelled.is_set)
+    wait_for(lambda: scheduler.status('stuck')['runs'] == 1)
+    assert scheduler.status('stuck')['timeouts'] == 1
+    scheduler.stop('stuck')
+
+def test_job_routes():
+    app = Flask(__name__)
+    scheduler = Scheduler()
+    scheduler.add('warm', lambda cancel: None, interval=60)
+    init_scheduler(app, scheduler)
+    client = app.test_client()
+
+    assert client.get('/jobs').get_json()['warm']['enabled'] is False
+    assert client.post('/jobs/warm/start').get_json()['changed'] is True
+    assert client.post('/jobs/warm/start').get_json()['changed'] is False
+    wait_for(lambda: scheduler.status('warm')['runs'] == 1)
+    assert client.post('/jobs/warm/stop').get_json()['status']['enabled'] is False
+    assert client.post('/jobs/nope/start').status_code == 404
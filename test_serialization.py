@@ -0,0 +1,52 @@
+import gzip
+import json
+
+import numpy as np
+from flask import Flask, jsonify
+
+from response_cache import ResponseCache
+from serialization import FastJSONProvider, init_serialization
+
+def make_app(min_size=100):
+    app = Flask(__name__)
+    init_serialization(app, min_size=min_size)
+    cache = ResponseCache(ttl=60)
+
+    @app.route('/big')
+    @cache.cached()
+    def big():
+        return jsonify([{'coin': f'coin-{i}', 'price': i * 1.5} for i in range(200)])
+
+    @app.route('/small')
+    def small():
+        return jsonify({'status': 'ok'})
+
+    return app.test_client()
+
+def test_fast_provider_matches_stdlib_output():
+    app = Flask(__name__)
+    data = {'b': [1, 2.5, None, True], 'a': {'nested': 'text'}, 'count': np.int64(3), 'ratio': np.float64(0.25)}
+    fast = FastJSONProvider(app).response(data).get_data()
+    assert json.loads(fast) == {'a': {'nested': 'text'}, 'b': [1, 2.5, None, True], 'count': 3, 'ratio': 0.25}
+    assert fast == app.json.response({k: v.item() if hasattr(v, 'item') else v for k, v in data.items()}).get_data()
+
+def test_gzip_negotiated_above_threshold():
+    client = make_app()
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(json.loads(gzip.decompress(response.data))) == 200
+
+    assert 'Content-Encoding' not in client.get('/big').headers
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/big', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+def test_etag_varies_by_encoding():
+    client = make_app()
+    plain = client.get('/big').headers['ETag']
+    compressed = client.get('/big', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    assert compressed == plain[:-1] + '-gzip"'
+
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip', 'If-None-Match': compressed})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == compressed
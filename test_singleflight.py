@@ -0,0 +1,52 @@
+import threading
+import time
+from singleflight import SingleFlight
+
+def run_concurrently(flight, key, fn, n=8):
+    results, errors = [], []
+    def worker():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+# Eight identical concurrent requests run the work once and share the result
+def test_coalesce():
+    flight = SingleFlight()
+    calls = []
+    def slow_analysis():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'coin_id': 'bitcoin'}
+
+    results, errors = run_concurrently(flight, ('bitcoin', None), slow_analysis)
+    assert len(calls) == 1
+    assert not errors
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert flight.in_flight() == 0
+    print(f"Coalesced {len(results)} requests into {len(calls)} call")
+
+# Every waiter sees the leader's error
+def test_error_propagation():
+    flight = SingleFlight()
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("upstream down")
+
+    results, errors = run_concurrently(flight, ('bitcoin', None), failing)
+    assert not results
+    assert len(errors) == 8 and all(isinstance(e, ValueError) for e in errors)
+
+    # The key is released, so the next call runs again
+    assert flight.do(('bitcoin', None), lambda: 42) == 42
+    print("Errors propagated to all waiters")
+
+if __name__ == "__main__":
+    test_coalesce()
+    test_error_propagation()
@@ -0,0 +1,14 @@
+import subprocess
+import sys
+
+from benchmarks import ENTRY_POINTS, startup
+
+def test_entry_points_start_without_heavy_imports():
+    for row in startup(list(ENTRY_POINTS), repeat=1):
+        assert row['status'] == 200, row
+        assert row['heavy_modules'] == [], row
+
+def test_strategies_imports_no_indicator_library():
+    code = "import sys, strategies; print(','.join(m for m in ('talib', 'pandas_ta', 'pandas', 'numpy') if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ''
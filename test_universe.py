@@ -0,0 +1,56 @@
+from support_resistance import SupportResistanceAnalyzer
+from synthetic_market import SyntheticMarket
+from universe import iter_coins
+
+class CountingSource:
+    def __init__(self, market):
+        self.market = market
+        self.calls = []
+
+    def get(self, url, params=None, timeout=10):
+        self.calls.append(dict(params or {}))
+        return self.market.get(url, params, timeout)
+
+def test_pages_are_fetched_lazily():
+    source = CountingSource(SyntheticMarket(n_coins=600, days=2))
+    stream = iter_coins(source, limit=300, per_page=100)
+    assert source.calls == []
+
+    first = next(stream)
+    assert first['id'] == source.market.coin_id(0)
+    assert [c['page'] for c in source.calls] == [1]
+
+    rest = list(stream)
+    assert len(rest) == 299
+    assert [c['page'] for c in source.calls] == [1, 2, 3]
+
+def test_filters():
+    market = SyntheticMarket(n_coins=300, days=2)
+    source = CountingSource(market)
+    caps = sorted((c['market_cap'] for c in market.coins()), reverse=True)
+    threshold = caps[150]
+
+    coins = list(iter_coins(source, min_market_cap=threshold, per_page=50))
+    assert len(coins) == 151
+    # Ranked by market cap, so paging stops at the first coin under the threshold
+    assert len(source.calls) == 4
+
+    volume = caps[10] * 0.05
+    assert all(c['total_volume'] >= volume for c in iter_coins(source, min_volume=volume))
+    list(iter_coins(source, limit=1, category='layer-1'))
+    assert source.calls[-1]['category'] == 'layer-1'
+
+def test_failed_page_ends_stream():
+    class Flaky(CountingSource):
+        def get(self, url, params=None, timeout=10):
+            if params['page'] == 2:
+                raise ConnectionError("boom")
+            return super().get(url, params, timeout)
+
+    assert len(list(iter_coins(Flaky(SyntheticMarket(n_coins=300, days=2)), per_page=100))) == 100
+
+def test_scan_consumes_stream():
+    market = SyntheticMarket(n_coins=40, days=30)
+    analyzer = SupportResistanceAnalyzer(market)
+    streamed = analyzer.scan_all_coins(100, 100, ['1d'], coins=iter_coins(market, limit=40, per_page=10))
+    assert streamed == analyzer.scan_all_coins(100, 100, ['1d'], coins=market.coins(40))
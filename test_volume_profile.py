@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from parallel_scan import scan_sharded
+from support_resistance import SupportResistanceAnalyzer
+from synthetic_market import SyntheticMarket
+
+def clustered_prices(scale):
+    """Price that dwells around 0.9x and 1.2x of scale, then ends in between"""
+    rng = np.random.default_rng(1)
+    low = scale * 0.9 * (1 + rng.normal(0, 0.002, 300))
+    high = scale * 1.2 * (1 + rng.normal(0, 0.002, 300))
+    path = scale * np.linspace(0.9, 1.2, 100)
+    return np.concatenate([low, path, high, path[::-1][:50]])
+
+@pytest.mark.parametrize('scale', [0.00002, 1.0, 60000.0])
+def test_levels_at_dense_zones_for_any_price_scale(scale):
+    analyzer = SupportResistanceAnalyzer(SyntheticMarket(n_coins=1, days=1))
+    supports, resistances = analyzer.find_volume_profile_levels(clustered_prices(scale))
+    assert any(abs(s / (scale * 0.9) - 1) < 0.01 for s in supports)
+    assert any(abs(r / (scale * 1.2) - 1) < 0.01 for r in resistances)
+
+def test_volume_weights_move_the_level():
+    analyzer = SupportResistanceAnalyzer(SyntheticMarket(n_coins=1, days=1))
+    prices = np.concatenate([np.full(50, 100.0), np.full(50, 110.0), np.full(3, 90.0), [105.0]])
+    volumes = np.concatenate([np.ones(50), np.ones(50), np.full(3, 100.0), [1.0]])
+    supports, _ = analyzer.find_volume_profile_levels(prices, bin_pct=1)
+    weighted, _ = analyzer.find_volume_profile_levels(prices, volumes, bin_pct=1)
+    assert not any(abs(s - 90) < 1 for s in supports)
+    assert any(abs(s - 90) < 1 for s in weighted)
+
+def test_engine_is_selectable():
+    market = SyntheticMarket(n_coins=6, days=60)
+    analyzer = SupportResistanceAnalyzer(market)
+    coin = market.coins(1)[0]
+    profile = analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['4h'], engine='volume_profile')
+    pivots = analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['4h'])
+    assert (profile['engine'], pivots['engine']) == ('volume_profile', 'pivots')
+    assert profile['timeframes']['4h']['supports'] != pivots['timeframes']['4h']['supports']
+    with pytest.raises(ValueError):
+        analyzer.analyze_coin(coin['id'], coin['name'], coin['symbol'], ['4h'], engine='astrology')
+
+    analyzer.engine = 'volume_profile'
+    coins = market.coins()
+    assert scan_sharded(analyzer, coins, 100, 100, ['1h'], workers=2) == \
+        analyzer.scan_all_coins(100, 100, ['1h'], coins=coins, workers=1)
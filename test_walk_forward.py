@@ -0,0 +1,38 @@
+from support_resistance import SupportResistanceAnalyzer
+from synthetic_market import SyntheticMarket
+from walk_forward import WalkForwardBacktest
+
+def test_replay_matches_generate_recommendations():
+    market = SyntheticMarket(n_coins=4, days=60)
+    analyzer = SupportResistanceAnalyzer(market)
+    prices = market.series(3)
+    backtest = WalkForwardBacktest(analyzer, '1h')
+    replayed = dict(backtest.signals(prices))
+    assert replayed
+
+    for t in range(backtest.window - 1, len(prices), 5):
+        window = prices[t - backtest.window + 1:t + 1]
+        expected = analyzer.build_analysis('c', 'C', 'c', prices[t], {'1h': window})['recommendations']
+        assert replayed.get(t, []) == expected
+
+def test_run_simulates_trades():
+    market = SyntheticMarket(n_coins=4, days=60)
+    result = WalkForwardBacktest(SupportResistanceAnalyzer(market), '1h', max_hold=48).run(market.series(2))
+    summary = result['summary']
+    assert result['signals'] > 0 and summary['trades'] > 0
+    assert sum(summary['outcomes'].values()) == len(result['trades'])
+    for trade in result['trades']:
+        assert trade['signal_bar'] < trade['entry_bar'] <= trade['exit_bar'] <= trade['entry_bar'] + 48
+        if trade['outcome'] == 'stop_loss':
+            assert trade['return_pct'] < 0
+
+def test_other_engines_recompute_each_window():
+    market = SyntheticMarket(n_coins=4, days=20)
+    analyzer = SupportResistanceAnalyzer(market)
+    prices = market.series(1)
+    backtest = WalkForwardBacktest(analyzer, '15m', engine='volume_profile')
+    for t, recommendations in backtest.signals(prices):
+        window = prices[t - backtest.window + 1:t + 1]
+        expected = analyzer.build_analysis('c', 'C', 'c', prices[t], {'15m': window},
+                                           engine='volume_profile')['recommendations']
+        assert recommendations == expected
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+
+from api.index import SupportResistanceAnalyzer
+from warm_start import SNAPSHOT_VERSION, PriceSnapshot
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+    def __call__(self):
+        return self.now
+
+def make_snapshot(path, clock):
+    snapshot = PriceSnapshot(str(path), max_age=300)
+    snapshot.clock = clock
+    return snapshot
+
+def test_snapshot_round_trip_with_version_and_age_checks(tmp_path):
+    path = tmp_path / 'snap.json'
+    clock = Clock()
+    snapshot = make_snapshot(path, clock)
+    snapshot.record('bitcoin', 100.0, 'Binance')
+    assert json.loads(path.read_text())['version'] == SNAPSHOT_VERSION
+    assert snapshot.take('bitcoin') is None  # an instance never serves its own prices back
+
+    clock.now += 60
+    fresh = make_snapshot(path, clock)
+    assert fresh.load() == 1
+    assert fresh.take('bitcoin') == (100.0, 'Binance', 1000.0)
+    assert fresh.take('bitcoin') is None  # once only
+
+    fresh = make_snapshot(path, clock)
+    fresh.load()
+    clock.now += 300
+    assert fresh.take('bitcoin') is None  # too old by now
+
+    assert make_snapshot(path, clock).load() == 0  # saved too long ago
+
+    # Writes are throttled; flush() catches up
+    snapshot = make_snapshot(path, clock)
+    snapshot.record('bitcoin', 101.0, 'Binance')
+    snapshot.record('ethereum', 5.0, 'Binance')
+    assert list(json.loads(path.read_text())['prices']) == ['bitcoin']
+    snapshot.flush()
+    assert sorted(json.loads(path.read_text())['prices']) == ['bitcoin', 'ethereum']
+    path.write_text(json.dumps({'version': SNAPSHOT_VERSION + 1, 'saved_at': clock.now, 'prices': {}}))
+    assert make_snapshot(path, clock).load() == 0
+    path.write_text('{not json')
+    assert make_snapshot(path, clock).load() == 0
+
+def test_cold_start_answers_once_from_snapshot_then_goes_live(tmp_path):
+    path = tmp_path / 'snap.json'
+    clock = Clock(time.time() - 120)
+    make_snapshot(path, clock).record('bitcoin', 100.0, 'Kraken')
+
+    calls = []
+    def provider(coin_id):
+        calls.append(coin_id)
+        return 105.0
+
+    clock.now += 120
+    snapshot = make_snapshot(path, clock)
+    snapshot.load()
+    analyzer = SupportResistanceAnalyzer(snapshot=snapshot)
+    analyzer.price_providers = lambda: [('Live', provider)]
+
+    result = analyzer.fetch_price('bitcoin')
+    assert result['price'] == 100.0 and result['provider'] == 'snapshot'
+    assert result['fetched_at'] == clock.now - 120
+    assert result['providers']['snapshot']['source'] == 'Kraken'
+    assert calls == []
+
+    # No background refresh: the next request fetches live and updates the file
+    result = analyzer.fetch_price('bitcoin')
+    assert result['price'] == 105.0 and result['provider'] == 'Live'
+    assert 'fetched_at' not in result
+    assert calls == ['bitcoin']
+    assert json.loads(path.read_text())['prices']['bitcoin'][0] == 105.0
+
+    # Unknown coins go to the providers
+    assert analyzer.fetch_price('ethereum')['provider'] == 'Live'
+
+def test_refresh_job_saves_top_coin_prices(tmp_path):
+    path = tmp_path / 'snap.json'
+    analyzer = SupportResistanceAnalyzer(snapshot=make_snapshot(path, Clock(time.time())))
+    analyzer.price_providers = lambda: [('Live', lambda coin_id: 42.0)]
+    analyzer.refresh_snapshot(threading.Event(), limit=3)
+    assert sorted(json.loads(path.read_text())['prices']) == ['bitcoin', 'ethereum', 'solana']
@@ -0,0 +1,74 @@
+import logging
+import os
+from itertools import count
+
+from metrics import upstream
+
+logger = logging.getLogger(__name__)
+
+COINGECKO_MARKETS = "https://api.coingecko.com/api/v3/coins/markets"
+MAX_PER_PAGE = 250  # CoinGecko's largest page
+
+def iter_coins(source, limit=None, min_market_cap=None, min_volume=None, category=None,
+               per_page=MAX_PER_PAGE, vs_currency='usd'):
+    """Yield coins from /coins/markets by market cap, one page at a time.
+
+    Pages are only requested as the consumer gets to them, so a scan over
+    thousands of coins holds one page in memory at a time. category is
+    filtered by CoinGecko, min_market_cap and min_volume (in vs_currency)
+    locally. Because coins arrive in market cap order, the first one under
+    min_market_cap ends the stream. A failed page ends it too, with a
+    warning; whatever was yielded before stands.
+    """
+    if limit is not None and limit <= 0:
+        return
+    yielded = 0
+    for page in count(1):
+        params = {
+            'vs_currency': vs_currency,
+            'order': 'market_cap_desc',
+            'per_page': per_page,
+            'page': page
+        }
+        if category:
+            params['category'] = category
+        try:
+            with upstream('universe_page') as check:
+                response = source.get(COINGECKO_MARKETS, params=params)
+                coins = response.json() if check(response) else None
+        except Exception as e:
+            logger.warning("Universe page %d failed: %s", page, e)
+            return
+        if not isinstance(coins, list):
+            logger.warning("Universe page %d failed with status %s", page, response.status_code)
+            return
+
+        for coin in coins:
+            if min_market_cap is not None and (coin.get('market_cap') or 0) < min_market_cap:
+                return
+            if min_volume is not None and (coin.get('total_volume') or 0) < min_volume:
+                continue
+            yield coin
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+        if len(coins) < per_page:
+            return
+
+def universe_filters(args):
+    """iter_coins keyword arguments from request query parameters, or None if none were given.
+
+    A request can't ask for more than SCAN_UNIVERSE_MAX coins (default 2000).
+    """
+    filters = {
+        'limit': args.get('universe', type=int),
+        'min_market_cap': args.get('min_market_cap', type=float),
+        'min_volume': args.get('min_volume', type=float),
+        'category': args.get('category') or None
+    }
+    if all(value is None for value in filters.values()):
+        return None
+    cap = int(os.environ.get('SCAN_UNIVERSE_MAX', 2000))
+    filters['limit'] = min(filters['limit'] or cap, cap)
+    return filters
@@ -0,0 +1,213 @@
+"""Replay generate_recommendations over price history and simulate the trades.
+
+At every bar the backtest sees only the last `window` closes, the same
+history analyze_coin would have fetched for the timeframe (168 hourly bars
+for '1h'). It asks generate_recommendations for signals and simulates each
+one: the entry is a limit order that fills at entry_price the first time a
+later close reaches it (within max_wait bars). The trade then exits at the first close beyond
+stop_loss or take_profit, or at the close max_hold bars later.
+
+Recomputing find_support_resistance on every window would cost O(window)
+per bar. For the pivots engine the levels are kept incrementally instead:
+whether a bar is a local extreme only depends on its neighbours, so pivots
+are found once for the whole series, and a sorted list of the pivot values
+inside the window is updated as one pivot enters and one leaves per bar.
+The levels match find_support_resistance on the same window exactly. Other
+engines fall back to recomputing each window.
+"""
+import bisect
+
+import numpy as np
+
+from results import Analysis, TimeframeLevels, levels, round_price
+
+class RollingPivots:
+    """Pivot supports/resistances of a sliding window, as find_support_resistance reports them"""
+
+    def __init__(self, prices, window, strength=2, round_levels=True):
+        self.prices = prices
+        self.window = window
+        self.strength = strength
+        self.round_levels = round_levels
+        n = len(prices)
+        is_support = np.zeros(n, dtype=bool)
+        is_resistance = np.zeros(n, dtype=bool)
+        if n > 2 * strength:
+            middle = prices[strength:n - strength]
+            is_support[strength:n - strength] = True
+            is_resistance[strength:n - strength] = True
+            for j in range(1, strength + 1):
+                for neighbour in (prices[strength - j:n - strength - j], prices[strength + j:n - strength + j]):
+                    is_support[strength:n - strength] &= middle <= neighbour
+                    is_resistance[strength:n - strength] &= middle >= neighbour
+        # Rounded as find_support_resistance dedupes them; only positive prices count
+        self._support_values = self._rounded(prices, is_support & (prices > 0))
+        self._resistance_values = self._rounded(prices, is_resistance & (prices > 0))
+        self._supports = []
+        self._resistances = []
+        self._bar = None
+
+    @staticmethod
+    def _rounded(prices, mask):
+        values = np.full(len(prices), np.nan)
+        index = np.flatnonzero(mask)
+        values[index] = [round_price(p, 2) for p in prices[index]]
+        return values
+
+    def _move(self, i, add):
+        for values, target in ((self._support_values, self._supports), (self._resistance_values, self._resistances)):
+            value = values[i]
+            if value == value:  # not nan
+                if add:
+                    bisect.insort(target, value)
+                else:
+                    del target[bisect.bisect_left(target, value)]
+
+    def advance(self, t):
+        """Move the window to end at bar t; bars must be visited in order"""
+        s, w = self.strength, self.window
+        if self._bar is None:
+            # A pivot at i is visible in the window ending at t if i +- strength both lie inside it
+            for i in range(max(t - w + 1 + s, s), t - s + 1):
+                self._move(i, True)
+        else:
+            for bar in range(self._bar + 1, t + 1):
+                if bar - s >= 0:
+                    self._move(bar - s, True)
+                if bar - w + s >= s:
+                    self._move(bar - w + s, False)
+        self._bar = t
+
+    @staticmethod
+    def _top(values, count):
+        top = []
+        for value in reversed(values):
+            if not top or value != top[-1]:
+                top.append(value)
+                if len(top) == count:
+                    break
+        return top
+
+    def levels(self):
+        """(supports ascending, resistances descending) for the current window, at most 8 of each"""
+        current_price = self.prices[self._bar]
+        base = int(current_price / 100) * 100
+        round_levels = [base + i * 100 for i in range(-5, 6) if base + i * 100 > 0] if self.round_levels else []
+        supports = set(self._top(self._supports, 8))
+        supports.update(p for p in round_levels if p < current_price)
+        resistances = set(self._top(self._resistances, 8))
+        resistances.update(p for p in round_levels if p > current_price)
+        return sorted(supports)[-8:], sorted(resistances, reverse=True)[:8]
+
+class WalkForwardBacktest:
+    def __init__(self, analyzer, timeframe='1h', window=None, engine=None, max_wait=24, max_hold=168, quote='usd'):
+        self.analyzer = analyzer
+        self.quote = quote
+        self.timeframe = timeframe
+        if window is None:
+            config = analyzer.timeframes[timeframe]
+            window = config['days'] * (24 if config['interval'] == 'hourly' else 1)
+        self.window = max(int(window), 6)
+        self.engine = engine or analyzer.engine
+        self.max_wait = max_wait
+        self.max_hold = max_hold
+
+    def _timeframe_levels(self, supports, resistances, current_price):
+        # Same arithmetic as SupportResistanceAnalyzer.build_analysis
+        nearest_support = max((s for s in supports if s < current_price), default=None)
+        nearest_resistance = min((r for r in resistances if r > current_price), default=None)
+        support_distance = ((current_price - nearest_support) / current_price * 100) if nearest_support else None
+        resistance_distance = ((nearest_resistance - current_price) / current_price * 100) if nearest_resistance else None
+        return TimeframeLevels(
+            supports=levels(supports),
+            resistances=levels(resistances),
+            nearest_support=nearest_support,
+            nearest_resistance=nearest_resistance,
+            support_distance_pct=round(support_distance, 2) if support_distance else None,
+            resistance_distance_pct=round(resistance_distance, 2) if resistance_distance else None
+        )
+
+    def signals(self, prices, volumes=None):
+        """Yield (bar, recommendations) for every bar with a full window behind it"""
+        prices = np.asarray(prices, dtype=float)
+        pivots = RollingPivots(prices, self.window, round_levels=self.quote == 'usd') if self.engine == 'pivots' else None
+        # Unwrapped from its timing decorator so a replay doesn't flood the live stage metrics
+        recommend = getattr(type(self.analyzer).generate_recommendations, '__wrapped__', None)
+        for t in range(self.window - 1, len(prices)):
+            current_price = prices[t]
+            if pivots is not None:
+                pivots.advance(t)
+                supports, resistances = pivots.levels()
+            else:
+                start = t - self.window + 1
+                supports, resistances = self.analyzer.find_levels(
+                    prices[start:t + 1], None if volumes is None else volumes[start:t + 1], self.engine, self.quote)
+            analysis = Analysis(coin_id=None, name=None, symbol=None, current_price=current_price,
+                                engine=self.engine, quote=self.quote, recommendations=[],
+                                timeframes={self.timeframe: self._timeframe_levels(supports, resistances, current_price)})
+            recommendations = recommend(self.analyzer, analysis) if recommend else \
+                self.analyzer.generate_recommendations(analysis)
+            if recommendations:
+                yield t, recommendations
+
+    def _simulate(self, prices, t, rec):
+        trade = {'signal_bar': t, 'type': rec['type'], 'timeframe': rec['timeframe'],
+                 'entry_price': rec['entry_price'], 'stop_loss': rec['stop_loss'], 'take_profit': rec['take_profit']}
+        buy = rec['type'] == 'BUY'
+        waiting = prices[t + 1:t + 1 + self.max_wait]
+        touched = np.flatnonzero(waiting <= rec['entry_price'] if buy else waiting >= rec['entry_price'])
+        if not len(touched):
+            trade['outcome'] = 'unfilled'
+            return trade, t + len(waiting)
+        entry_bar = t + 1 + touched[0]
+        held = prices[entry_bar + 1:entry_bar + 1 + self.max_hold]
+        if buy:
+            stopped, target = held <= rec['stop_loss'], held >= rec['take_profit']
+        else:
+            stopped, target = held >= rec['stop_loss'], held <= rec['take_profit']
+        hits = np.flatnonzero(stopped | target)
+        if len(hits):
+            exit_bar = entry_bar + 1 + hits[0]
+            trade['outcome'] = 'stop_loss' if stopped[hits[0]] else 'take_profit'
+        else:
+            exit_bar = entry_bar + len(held)
+            trade['outcome'] = 'expired' if len(held) == self.max_hold else 'open'
+        # A limit order fills at its price; a close that gapped past it doesn't make the fill better or worse
+        entry, exit_price = float(rec['entry_price']), float(prices[exit_bar])
+        trade.update(entry_bar=int(entry_bar), exit_bar=int(exit_bar), entry=entry, exit=exit_price,
+                     return_pct=round(((exit_price / entry - 1) if buy else (1 - exit_price / entry)) * 100, 4))
+        return trade, exit_bar
+
+    def run(self, prices, volumes=None):
+        """Replay the signals and simulate trades, at most one position per side at a time.
+
+        Returns {'bars', 'signals', 'trades', 'summary'}; trades that never
+        filled are counted in the summary but not listed.
+        """
+        prices = np.asarray(prices, dtype=float)
+        busy_until = {'BUY': -1, 'SELL': -1}
+        signals, unfilled, trades = 0, 0, []
+        for t, recommendations in self.signals(prices, volumes):
+            signals += len(recommendations)
+            for rec in recommendations:
+                if t <= busy_until[rec['type']]:
+                    continue
+                trade, busy_until[rec['type']] = self._simulate(prices, t, rec)
+                if trade['outcome'] == 'unfilled':
+                    unfilled += 1
+                else:
+                    trades.append(trade)
+
+        closed = [trade for trade in trades if trade['outcome'] != 'open']
+        returns = np.array([trade['return_pct'] for trade in closed])
+        summary = {
+            'trades': len(closed),
+            'unfilled': unfilled,
+            'open': len(trades) - len(closed),
+            'win_rate': round(float((returns > 0).mean()) * 100, 2) if len(returns) else None,
+            'avg_return_pct': round(float(returns.mean()), 4) if len(returns) else None,
+            'total_return_pct': round(float(np.prod(1 + returns / 100) - 1) * 100, 4) if len(returns) else None,
+            'outcomes': {outcome: sum(1 for trade in trades if trade['outcome'] == outcome)
+                         for outcome in ('take_profit', 'stop_loss', 'expired', 'open')}
+        }
+        return {'bars': len(prices), 'signals': signals, 'trades': trades, 'summary': summary}
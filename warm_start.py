@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+class PriceSnapshot:
+    """Last known prices, kept in a small JSON file that outlives the process.
+
+    A new serverless instance on the same host (or with the same mounted
+    temp dir) loads it, so the first request for a coin can be answered
+    straight away instead of going through the providers. Entries are
+    (price, provider, fetched_at wall time).
+
+    Only prices loaded from the file are ever handed out, each at most once
+    through take(): the request after it fetches live, and from then on the
+    instance has its own fresh prices. Entries older than max_age
+    (WARM_START_MAX_AGE, default 300 s) are not handed out, and a file with
+    another version or saved longer ago than that is ignored.
+
+    record() keeps every live price for the next instance. The file is
+    written on the request path, so record() writes it at most once every
+    save_interval seconds (WARM_START_SAVE_INTERVAL, default 10); prices
+    recorded in between wait for the next write or flush(). The file is
+    rewritten through a temp file and a rename, so concurrent instances
+    never read half a file.
+
+    Only prices are kept. In api/index.py the coin list is a static table
+    and the levels follow arithmetically from the price, so persisting
+    coin metadata or computed levels would save no work on a cold start.
+    """
+
+    def __init__(self, path=None, max_age=None, save_interval=None):
+        self.path = path or os.environ.get(
+            'WARM_START_PATH', os.path.join(tempfile.gettempdir(), 'sr_warm_start.json'))
+        self.max_age = max_age if max_age is not None else float(os.environ.get('WARM_START_MAX_AGE', 300))
+        self.save_interval = save_interval if save_interval is not None else \
+            float(os.environ.get('WARM_START_SAVE_INTERVAL', 10))
+        self.clock = time.time
+        self.prices = {}
+        self._loaded = {}
+        self._dirty = False
+        self._last_save = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read the snapshot file; returns the number of usable prices"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable warm start snapshot %s: %s", self.path, e)
+            return 0
+        now = self.clock()
+        if not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION:
+            logger.info("Ignoring warm start snapshot %s: version %s", self.path,
+                        data.get('version') if isinstance(data, dict) else None)
+            return 0
+        if now - data.get('saved_at', 0) > self.max_age:
+            logger.info("Ignoring warm start snapshot %s: saved %.0f s ago", self.path, now - data.get('saved_at', 0))
+            return 0
+        with self._lock:
+            for coin_id, (price, provider, fetched_at) in data.get('prices', {}).items():
+                if now - fetched_at <= self.max_age and coin_id not in self.prices:
+                    self.prices[coin_id] = self._loaded[coin_id] = (price, provider, fetched_at)
+            loaded = len(self._loaded)
+        logger.info("Loaded %d prices from warm start snapshot %s", loaded, self.path)
+        return loaded
+
+    def take(self, coin_id):
+        """(price, provider, fetched_at) loaded from the file, once per coin; None if gone or too old"""
+        with self._lock:
+            entry = self._loaded.pop(coin_id, None)
+        if entry is None or self.clock() - entry[2] > self.max_age:
+            return None
+        return entry
+
+    def record(self, coin_id, price, provider):
+        """Keep a live price for the next instance; the loaded one is no longer handed out"""
+        with self._lock:
+            now = self.clock()
+            self.prices[coin_id] = (price, provider, now)
+            self._loaded.pop(coin_id, None)
+            self._dirty = True
+            due = self._last_save is None or now - self._last_save >= self.save_interval
+        if due:
+            self.save()
+
+    def flush(self):
+        """Write prices recorded since the last save, if any"""
+        if self._dirty:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            now = self.clock()
+            self._dirty = False
+            self._last_save = now
+            data = {'version': SNAPSHOT_VERSION, 'saved_at': now,
+                    'prices': {k: list(v) for k, v in self.prices.items() if now - v[2] <= self.max_age}}
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix='.warm_start.')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Could not save warm start snapshot %s: %s", self.path, e)
+            if tmp and os.path.exists(tmp):
+                os.unlink(tmp)
+            return False
+        return True